@@ -5,15 +5,99 @@
 #
 #   Two modes:
 #   1. From cloned repo: ./install.sh  (uses local files)
-#   2. Via curl:         curl ... | bash (clones repo first)
+#   2. Via curl:         curl ... | bash (fetches into a persistent
+#                        cache, ~/.cache/claude-os, updated in place)
+#
+#   Re-runs are incremental: scripts/sync-manifest.py records a
+#   content-hash manifest and only touches changed files.
+#   Run with --help for options.
 # ============================================================
 
 set -euo pipefail
 
+usage() {
+  cat <<'USAGE'
+Usage: ./install.sh [options]
+       curl -fsSL .../install.sh | bash -s -- [options]
+
+Options:
+  --no-manifest     Always copy every file (skip the incremental manifest sync)
+  -j, --jobs N      Run up to N independent install phases at once (default: 1)
+  --profile FILE    Write per-phase timings as JSON to FILE
+  --only LIST       Install only these .claude components, comma-separated
+                    (e.g. agents,rules/python,skills/backend-*)
+  --bundle FILE     Install from a git bundle instead of the network
+                    (create one with: git bundle create claude-os.bundle HEAD main)
+  --pin-mcp         Install desktop-commander at a locked version under
+                    ~/.claude/mcp and launch it without npx (scripts/mcp-pin.sh)
+  --supervise       Share warm desktop-commander processes across Claude
+                    sessions through scripts/mcp-supervisor.py
+  --wheelhouse DIR  Install SEO Python packages offline from prebuilt wheels
+                    in DIR (missing wheels are built into DIR first)
+  -h, --help        Show this help
+
+Environment:
+  CLAUDE_OS_CACHE       Cache directory (default: ~/.cache/claude-os)
+  CLAUDE_OS_REPO        Repository URL to fetch from
+  CLAUDE_OS_REF         Branch or tag to install (default: main)
+  CLAUDE_OS_WHEELHOUSE  Default for --wheelhouse
+USAGE
+}
+
+USE_MANIFEST=1
+JOBS=1
+PROFILE_FILE=""
+ONLY=""
+BUNDLE=""
+PIN_MCP=0
+SUPERVISE=0
+WHEELHOUSE="${CLAUDE_OS_WHEELHOUSE:-}"
+
+# Options that take a value: fail loudly instead of tripping `shift` under set -e
+need_value() {
+  if [ $# -lt 2 ] || [ -z "$2" ] || [[ "$2" == -* ]]; then
+    echo "$1 needs a value (see --help)" >&2; exit 1
+  fi
+}
+
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --no-manifest) USE_MANIFEST=0 ;;
+    -j|--jobs) need_value "$@"; JOBS="$2"; shift ;;
+    --profile) need_value "$@"; PROFILE_FILE="$2"; shift ;;
+    --only) need_value "$@"; ONLY="$2"; shift ;;
+    --bundle) need_value "$@"; BUNDLE="$2"; shift ;;
+    --pin-mcp) PIN_MCP=1 ;;
+    --supervise) SUPERVISE=1 ;;
+    --wheelhouse) need_value "$@"; WHEELHOUSE="$2"; shift ;;
+    -h|--help) usage; exit 0 ;;
+    *) echo "Unknown option: $1" >&2; exit 1 ;;
+  esac
+  shift
+done
+
+if [[ ! "$JOBS" =~ ^[1-9][0-9]*$ ]]; then
+  echo "--jobs expects a positive integer" >&2; exit 1
+fi
+ONLY_ITEMS=()
+if [ -n "$ONLY" ]; then
+  if [ "$USE_MANIFEST" != "1" ] || ! command -v python3 &>/dev/null; then
+    echo "--only needs the manifest sync (python3, no --no-manifest)" >&2; exit 1
+  fi
+  IFS=, read -r -a ONLY_ITEMS <<< "$ONLY"
+fi
+if [ -n "$BUNDLE" ]; then
+  [ -f "$BUNDLE" ] || { echo "Bundle not found: $BUNDLE" >&2; exit 1; }
+  BUNDLE="$(cd "$(dirname "$BUNDLE")" && pwd)/$(basename "$BUNDLE")"
+fi
+
 RED='\033[0;31m'; GREEN='\033[0;32m'; YELLOW='\033[1;33m'
 CYAN='\033[0;36m'; PURPLE='\033[0;35m'; BOLD='\033[1m'; RESET='\033[0m'
 
 CLAUDE_DIR="${CLAUDE_CONFIG_DIR:-$HOME/.claude}"
+CACHE_DIR="${CLAUDE_OS_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/claude-os}"
+REPO_URL="${CLAUDE_OS_REPO:-https://github.com/royaluniondesign-sys/claude-os.git}"
+REPO_REF="${CLAUDE_OS_REF:-main}"
 
 echo ""
 echo -e "${PURPLE}${BOLD}"
@@ -30,19 +114,53 @@ echo ""
 # --- Resolve repo root ---
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]:-$0}")" 2>/dev/null && pwd)"
 REPO_DIR=""
-CLEANUP_REPO=""
+
+# Sparse-checkout patterns: top-level files, scripts and configs, plus
+# either the whole .claude tree or only the --only components.
+sparse_patterns() {
+  local item
+  printf '/*\n!/*/\n/scripts/\n/mcp-configs/\n/templates/\n'
+  if [ -z "$ONLY" ]; then
+    printf '/.claude/\n'
+  else
+    for item in "${ONLY_ITEMS[@]}"; do
+      printf '/.claude/%s\n' "${item%/}"
+    done
+  fi
+}
+
+# Persistent cache: first run fetches a shallow, blob-less, sparse checkout;
+# later runs only fetch the new tip and check out the selected paths.
+fetch_repo() {
+  local source="origin" opts="--depth 1 --filter=blob:none"
+  if [ -n "$BUNDLE" ]; then
+    source="$BUNDLE"; opts=""
+  fi
+  if [ ! -d "$REPO_DIR/.git" ]; then
+    mkdir -p "$REPO_DIR"
+    git -C "$REPO_DIR" init -q
+    git -C "$REPO_DIR" remote add origin "$REPO_URL"
+    git -C "$REPO_DIR" config core.sparseCheckout true
+  fi
+  sparse_patterns > "$REPO_DIR/.git/info/sparse-checkout"
+  git -C "$REPO_DIR" fetch -q $opts "$source" "$REPO_REF"
+  git -C "$REPO_DIR" reset -q --hard FETCH_HEAD
+}
 
 # Check if running from cloned repo (local files exist)
-if [ -d "$SCRIPT_DIR/.claude/agents" ] && [ "$(ls "$SCRIPT_DIR/.claude/agents/"*.md 2>/dev/null | wc -l)" -gt 0 ]; then
+if [ -z "$BUNDLE" ] && [ -d "$SCRIPT_DIR/.claude/agents" ] && [ "$(ls "$SCRIPT_DIR/.claude/agents/"*.md 2>/dev/null | wc -l)" -gt 0 ]; then
   REPO_DIR="$SCRIPT_DIR"
   echo -e "${GREEN}Using local repo: $REPO_DIR${RESET}"
 else
-  # Running via curl or outside repo — clone first
-  echo -e "${CYAN}Cloning Claude OS repository...${RESET}"
-  REPO_DIR=$(mktemp -d)
-  CLEANUP_REPO="$REPO_DIR"
-  git clone --depth 1 https://github.com/royaluniondesign-sys/claude-os.git "$REPO_DIR" 2>/dev/null
-  echo -e "${GREEN}✓ Repository cloned${RESET}"
+  # Running via curl, outside the repo, or from a bundle — update the cache
+  REPO_DIR="$CACHE_DIR/repo"
+  if [ -n "$BUNDLE" ]; then
+    echo -e "${CYAN}Updating Claude OS cache from bundle $BUNDLE...${RESET}"
+  else
+    echo -e "${CYAN}Updating Claude OS cache in $CACHE_DIR...${RESET}"
+  fi
+  fetch_repo
+  echo -e "${GREEN}✓ Repository at $(git -C "$REPO_DIR" rev-parse --short HEAD)${RESET}"
 fi
 
 echo ""
@@ -73,66 +191,286 @@ echo ""
 # --- Create directories ---
 mkdir -p "$CLAUDE_DIR"/{agents,commands/gsd,skills,hooks,rules}
 
-# --- 1. Core components from repo ---
-echo -e "${CYAN}[1/4] Installing agents, skills, commands, rules, hooks...${RESET}"
-cp -r "$REPO_DIR/.claude/agents/." "$CLAUDE_DIR/agents/"
-cp -r "$REPO_DIR/.claude/commands/." "$CLAUDE_DIR/commands/"
+# --- Install phases ---
+# Each phase runs in a subshell: its status lines are buffered to
+# $LOG_DIR/<phase>.out and tool output goes to $PHASE_LOG, which is
+# only shown if the phase fails. Phases run up to $JOBS at a time.
 
-# Copy skills excluding any .venv directories (Python virtual environments)
-rsync -a --exclude='.venv' --exclude='node_modules' "$REPO_DIR/.claude/skills/" "$CLAUDE_DIR/skills/" 2>/dev/null || \
-  cp -r "$REPO_DIR/.claude/skills/." "$CLAUDE_DIR/skills/"
+count_components() {
+  if command -v python3 &>/dev/null; then
+    # Read from the component index instead of walking ~/.claude
+    read -r AGENT_COUNT SKILL_COUNT CMD_COUNT RULE_COUNT < <(python3 "$REPO_DIR/scripts/build-index.py" counts "$CLAUDE_DIR")
+  else
+    AGENT_COUNT=$(ls "$CLAUDE_DIR/agents/"*.md 2>/dev/null | wc -l | tr -d ' ')
+    SKILL_COUNT=$(ls -d "$CLAUDE_DIR/skills/"*/ 2>/dev/null | wc -l | tr -d ' ')
+    CMD_COUNT=$(find "$CLAUDE_DIR/commands" -name "*.md" 2>/dev/null | wc -l | tr -d ' ')
+    RULE_COUNT=$(ls -d "$CLAUDE_DIR/rules/"*/ 2>/dev/null | wc -l | tr -d ' ')
+  fi
+}
 
-for lang_dir in "$REPO_DIR/.claude/rules"/*/; do
-  lang="$(basename "$lang_dir")"
-  mkdir -p "$CLAUDE_DIR/rules/$lang"
-  cp -r "$lang_dir." "$CLAUDE_DIR/rules/$lang/"
-done
+# 1. Core components from repo
+phase_core() {
+  if [ "$USE_MANIFEST" = "1" ] && command -v python3 &>/dev/null; then
+    # Incremental: copy changed files, drop removed ones, keep user edits
+    SYNC_SUMMARY=$(python3 "$REPO_DIR/scripts/sync-manifest.py" sync "$REPO_DIR/.claude" "$CLAUDE_DIR" ${ONLY_ITEMS[@]+"${ONLY_ITEMS[@]}"})
+    echo -e "  ${SYNC_SUMMARY}"
+  else
+    cp -r "$REPO_DIR/.claude/agents/." "$CLAUDE_DIR/agents/"
+    cp -r "$REPO_DIR/.claude/commands/." "$CLAUDE_DIR/commands/"
 
-cp "$REPO_DIR/.claude/hooks.json" "$CLAUDE_DIR/hooks.json" 2>/dev/null || true
-
-AGENT_COUNT=$(ls "$CLAUDE_DIR/agents/"*.md 2>/dev/null | wc -l | tr -d ' ')
-SKILL_COUNT=$(ls -d "$CLAUDE_DIR/skills/"*/ 2>/dev/null | wc -l | tr -d ' ')
-CMD_COUNT=$(find "$CLAUDE_DIR/commands" -name "*.md" 2>/dev/null | wc -l | tr -d ' ')
-RULE_COUNT=$(ls -d "$CLAUDE_DIR/rules/"*/ 2>/dev/null | wc -l | tr -d ' ')
-echo -e "${GREEN}  ✓ ${AGENT_COUNT} agents, ${SKILL_COUNT} skills, ${CMD_COUNT} commands, ${RULE_COUNT} rulesets${RESET}"
-
-# --- 2. GSD hooks and statusline ---
-echo -e "${CYAN}[2/4] Installing GSD hooks, statusline, and runtime...${RESET}"
-npx get-shit-done-cc@latest --claude --global 2>/dev/null | grep -E "✓|Done" || true
-echo -e "${GREEN}  ✓ GSD runtime configured${RESET}"
-
-# --- 3. DesktopCommanderMCP ---
-echo -e "${CYAN}[3/4] Installing DesktopCommanderMCP...${RESET}"
-npx @wonderwhy-er/desktop-commander@latest setup --no-onboarding 2>/dev/null | grep -E "✅|successfully" || true
-echo -e "${GREEN}  ✓ desktop-commander MCP configured${RESET}"
-
-# --- 4. Claude SEO Python dependencies ---
-echo -e "${CYAN}[4/4] Setting up Claude SEO Python environment...${RESET}"
-SEO_DIR="$CLAUDE_DIR/skills/seo"
-if [ -d "$SEO_DIR" ] && command -v python3 &>/dev/null; then
-  if [ ! -d "$SEO_DIR/.venv" ]; then
-    python3 -m venv "$SEO_DIR/.venv" 2>/dev/null || true
-  fi
-  if [ -f "$SEO_DIR/.venv/bin/pip" ]; then
-    "$SEO_DIR/.venv/bin/pip" install --upgrade pip -q 2>/dev/null
-    "$SEO_DIR/.venv/bin/pip" install "Pillow>=11.0.0" -q 2>/dev/null
-    if [ -f "$SEO_DIR/requirements.txt" ]; then
-      "$SEO_DIR/.venv/bin/pip" install -r "$SEO_DIR/requirements.txt" -q 2>/dev/null || true
-    fi
-    echo -e "${GREEN}  ✓ SEO Python dependencies installed${RESET}"
+    # Copy skills excluding any .venv directories (Python virtual environments)
+    rsync -a --exclude='.venv' --exclude='node_modules' "$REPO_DIR/.claude/skills/" "$CLAUDE_DIR/skills/" 2>/dev/null || \
+      cp -r "$REPO_DIR/.claude/skills/." "$CLAUDE_DIR/skills/"
+
+    for lang_dir in "$REPO_DIR/.claude/rules"/*/; do
+      lang="$(basename "$lang_dir")"
+      mkdir -p "$CLAUDE_DIR/rules/$lang"
+      cp -r "$lang_dir." "$CLAUDE_DIR/rules/$lang/"
+    done
+
+    cp "$REPO_DIR/.claude/hooks.json" "$CLAUDE_DIR/hooks.json" 2>/dev/null || true
+  fi
+  if command -v python3 &>/dev/null; then
+    # Re-reads only agents/commands/skills/rules whose size or mtime changed
+    python3 "$REPO_DIR/scripts/build-index.py" build "$CLAUDE_DIR" >>"$PHASE_LOG"
+  fi
+  count_components
+  echo -e "${GREEN}  ✓ ${AGENT_COUNT} agents, ${SKILL_COUNT} skills, ${CMD_COUNT} commands, ${RULE_COUNT} rulesets${RESET}"
+}
+
+# 2. GSD hooks and statusline
+phase_gsd() {
+  npx get-shit-done-cc@latest --claude --global >>"$PHASE_LOG" 2>&1
+  echo -e "${GREEN}  ✓ GSD runtime configured${RESET}"
+}
+
+# 3. DesktopCommanderMCP
+phase_desktop_commander() {
+  if [ "$PIN_MCP" = "1" ]; then
+    # Locked version in $CLAUDE_DIR/mcp; its setup writes an npx entry,
+    # which register then points at the installed entry point.
+    "$REPO_DIR/scripts/mcp-pin.sh" install desktop-commander >>"$PHASE_LOG" 2>&1
+    "$REPO_DIR/scripts/mcp-pin.sh" exec desktop-commander setup --no-onboarding >>"$PHASE_LOG" 2>&1
+    "$REPO_DIR/scripts/mcp-pin.sh" register desktop-commander >>"$PHASE_LOG" 2>&1
+    echo -e "${GREEN}  ✓ desktop-commander MCP configured (pinned, see scripts/mcp-pin.sh verify)${RESET}"
   else
+    npx @wonderwhy-er/desktop-commander@latest setup --no-onboarding >>"$PHASE_LOG" 2>&1
+    echo -e "${GREEN}  ✓ desktop-commander MCP configured${RESET}"
+  fi
+  if [ "$SUPERVISE" = "1" ]; then
+    python3 "$REPO_DIR/scripts/mcp-supervisor.py" register desktop-commander >>"$PHASE_LOG" 2>&1
+    echo -e "${GREEN}  ✓ desktop-commander shared via mcp-supervisor${RESET}"
+  fi
+}
+
+# 4. Claude SEO Python dependencies
+SEO_BASE_REQS="Pillow>=11.0.0"
+
+# Hash of everything the SEO venv is built from: the requirements and the
+# venv interpreter's version. Prints nothing if the venv python is broken.
+seo_stamp() {
+  SEO_REQ_FILE="$SEO_DIR/requirements.txt" SEO_BASE_REQS="$SEO_BASE_REQS" \
+    SEO_VENV_PY="$SEO_DIR/.venv/bin/python" python3 -c '
+import hashlib, os, subprocess
+
+h = hashlib.sha256(os.environ["SEO_BASE_REQS"].encode() + b"\0")
+if os.path.exists(os.environ["SEO_REQ_FILE"]):
+    with open(os.environ["SEO_REQ_FILE"], "rb") as f:
+        h.update(f.read())
+h.update(subprocess.check_output([os.environ["SEO_VENV_PY"], "-c", "import sys; print(sys.version)"]))
+print(h.hexdigest())
+' 2>/dev/null || true
+}
+
+phase_seo() {
+  SEO_DIR="$CLAUDE_DIR/skills/seo"
+  if [ ! -d "$SEO_DIR" ] || ! command -v python3 &>/dev/null; then
+    echo -e "${YELLOW}  ⚠ SEO skill or Python not available. Skipping.${RESET}"
+    return 0
+  fi
+  local stamp_file="$SEO_DIR/.venv/.claude-os-stamp" stamp pip want have=""
+  # pyvenv.cfg records the Python the venv was built for; bin/python is only a
+  # symlink and follows an upgraded python3. A mismatch (or a missing or broken
+  # venv) means the old site-packages can't be used, so start afresh.
+  want="$(python3 -c 'import platform; print(platform.python_version())')"
+  if [ -f "$SEO_DIR/.venv/pyvenv.cfg" ] && [ -f "$SEO_DIR/.venv/bin/pip" ]; then
+    have="$(sed -n 's/^version *= *//p' "$SEO_DIR/.venv/pyvenv.cfg")"
+  fi
+  if [ "$have" != "$want" ] || [ -z "$(seo_stamp)" ]; then
+    python3 -m venv --clear "$SEO_DIR/.venv" >>"$PHASE_LOG" 2>&1 || true
+  fi
+  stamp="$(seo_stamp)"
+  if [ -n "$stamp" ] && [ -f "$stamp_file" ] && [ "$(cat "$stamp_file")" = "$stamp" ]; then
+    echo -e "${GREEN}  ✓ SEO Python environment up to date${RESET}"
+    return 0
+  fi
+  if [ ! -f "$SEO_DIR/.venv/bin/pip" ]; then
     echo -e "${YELLOW}  ⚠ Could not create Python venv. SEO visual analysis limited.${RESET}"
+    return 0
   fi
-else
-  echo -e "${YELLOW}  ⚠ SEO skill or Python not available. Skipping.${RESET}"
+  pip="$SEO_DIR/.venv/bin/pip"
+  set -- "$SEO_BASE_REQS"
+  [ -f "$SEO_DIR/requirements.txt" ] && set -- "$@" -r "$SEO_DIR/requirements.txt"
+
+  if [ -n "$WHEELHOUSE" ]; then
+    # Install offline from the wheelhouse; if it lacks a requirement, add the
+    # missing wheels (needs network) and retry
+    if ! "$pip" install -q --no-index --find-links "$WHEELHOUSE" "$@" >>"$PHASE_LOG" 2>&1; then
+      mkdir -p "$WHEELHOUSE"
+      "$pip" wheel -q -w "$WHEELHOUSE" "$@" >>"$PHASE_LOG" 2>&1
+      echo -e "${GREEN}  ✓ Wheelhouse updated in $WHEELHOUSE${RESET}"
+      "$pip" install -q --no-index --find-links "$WHEELHOUSE" "$@" >>"$PHASE_LOG" 2>&1
+    fi
+  else
+    "$pip" install --upgrade pip -q >>"$PHASE_LOG" 2>&1
+    "$pip" install -q "$@" >>"$PHASE_LOG" 2>&1
+  fi
+  seo_stamp > "$stamp_file"
+  echo -e "${GREEN}  ✓ SEO Python dependencies installed${RESET}"
+}
+
+PHASE_NAMES=(core gsd desktop_commander seo)
+PHASE_TITLES=(
+  "[1/4] Installing agents, skills, commands, rules, hooks..."
+  "[2/4] Installing GSD hooks, statusline, and runtime..."
+  "[3/4] Installing DesktopCommanderMCP..."
+  "[4/4] Setting up Claude SEO Python environment..."
+)
+# Space-separated phase names that must succeed first. GSD writes into the
+# same commands/ and agents/ dirs as core, so it runs after it (as it always did).
+PHASE_DEPS=("" "core" "" "core")
+
+now() {
+  # EPOCHREALTIME (bash 5+) gives sub-second timing; fall back to seconds
+  if [ -n "${EPOCHREALTIME:-}" ]; then echo "${EPOCHREALTIME/,/.}"; else date +%s; fi
+}
+
+elapsed() { awk -v s="$1" -v e="$2" 'BEGIN { printf "%.3f", e - s }'; }
+
+phase_state() {
+  local i
+  for i in "${!PHASE_NAMES[@]}"; do
+    [ "${PHASE_NAMES[$i]}" = "$1" ] && echo "${PHASE_STATE[$i]}"
+  done
+}
+
+report_phase() {
+  local i="$1" name="${PHASE_NAMES[$1]}"
+  echo -e "${CYAN}${PHASE_TITLES[$i]}${RESET} ($(elapsed "${PHASE_START[$i]}" "${PHASE_END[$i]}" | awk '{ printf "%.1f", $1 }')s)"
+  case "${PHASE_STATE[$i]}" in
+    skipped)
+      echo -e "${YELLOW}  ⚠ Skipped: depends on a failed phase (${PHASE_DEPS[$i]})${RESET}" ;;
+    *)
+      cat "$LOG_DIR/$name.out" ;;
+  esac
+  if [ "${PHASE_STATE[$i]}" = "failed" ]; then
+    echo -e "${RED}  ✗ Failed. Last lines of $LOG_DIR/$name.log:${RESET}"
+    tail -n 20 "$LOG_DIR/$name.log" 2>/dev/null | sed 's/^/    /'
+  fi
+}
+
+# Kill a phase subshell and everything it started (npx, pip, node...)
+kill_tree() {
+  local child
+  for child in $(pgrep -P "$1" 2>/dev/null); do kill_tree "$child"; done
+  kill "$1" 2>/dev/null || true
+}
+
+stop_phases() {
+  local i
+  for i in "${!PHASE_NAMES[@]}"; do
+    if [ "${PHASE_STATE[$i]:-}" = "running" ]; then kill_tree "${PHASE_PIDS[$i]}"; fi
+  done
+}
+
+run_phases() {
+  local total=${#PHASE_NAMES[@]} finished=0 running=0 i dep ready rc
+  for i in "${!PHASE_NAMES[@]}"; do PHASE_STATE[$i]=pending; done
+
+  while [ "$finished" -lt "$total" ]; do
+    # Reap finished phases
+    for i in "${!PHASE_NAMES[@]}"; do
+      [ "${PHASE_STATE[$i]}" = "running" ] || continue
+      kill -0 "${PHASE_PIDS[$i]}" 2>/dev/null && continue
+      wait "${PHASE_PIDS[$i]}" && rc=0 || rc=$?
+      PHASE_END[$i]=$(now)
+      if [ "$rc" -eq 0 ]; then PHASE_STATE[$i]=ok; else PHASE_STATE[$i]=failed; fi
+      running=$((running - 1)); finished=$((finished + 1))
+      report_phase "$i"
+    done
+
+    # Start phases whose dependencies are done, up to $JOBS at a time
+    for i in "${!PHASE_NAMES[@]}"; do
+      [ "${PHASE_STATE[$i]}" = "pending" ] || continue
+      ready=yes
+      for dep in ${PHASE_DEPS[$i]}; do
+        case "$(phase_state "$dep")" in
+          ok) ;;
+          failed|skipped) ready=skip ;;
+          *) [ "$ready" = "skip" ] || ready=no ;;
+        esac
+      done
+      if [ "$ready" = "skip" ]; then
+        PHASE_START[$i]=$(now); PHASE_END[$i]=${PHASE_START[$i]}
+        PHASE_STATE[$i]=skipped; finished=$((finished + 1))
+        report_phase "$i"
+      elif [ "$ready" = "yes" ] && [ "$running" -lt "$JOBS" ]; then
+        PHASE_START[$i]=$(now)
+        ( PHASE_LOG="$LOG_DIR/${PHASE_NAMES[$i]}.log"; "phase_${PHASE_NAMES[$i]}" ) \
+          >"$LOG_DIR/${PHASE_NAMES[$i]}.out" 2>&1 &
+        PHASE_PIDS[$i]=$!
+        PHASE_STATE[$i]=running; running=$((running + 1))
+      fi
+    done
+
+    if [ "$running" -gt 0 ]; then sleep 0.1; fi
+  done
+}
+
+write_profile() {
+  local i sep=","
+  {
+    echo "{"
+    echo "  \"jobs\": $JOBS,"
+    echo "  \"total_seconds\": $(elapsed "$PIPELINE_START" "$PIPELINE_END"),"
+    echo "  \"phases\": ["
+    for i in "${!PHASE_NAMES[@]}"; do
+      [ "$i" -eq $((${#PHASE_NAMES[@]} - 1)) ] && sep=""
+      printf '    {"name": "%s", "status": "%s", "start_seconds": %s, "seconds": %s}%s\n' \
+        "${PHASE_NAMES[$i]}" "${PHASE_STATE[$i]}" \
+        "$(elapsed "$PIPELINE_START" "${PHASE_START[$i]}")" \
+        "$(elapsed "${PHASE_START[$i]}" "${PHASE_END[$i]}")" "$sep"
+    done
+    echo "  ]"
+    echo "}"
+  } > "$PROFILE_FILE"
+}
+
+LOG_DIR=$(mktemp -d)
+PHASE_STATE=(); PHASE_PIDS=()
+trap stop_phases EXIT
+trap 'stop_phases; exit 130' INT TERM
+PIPELINE_START=$(now)
+run_phases
+PIPELINE_END=$(now)
+if [ -n "$PROFILE_FILE" ]; then write_profile; fi
+
+FAILED_PHASES=""
+for i in "${!PHASE_NAMES[@]}"; do
+  [ "${PHASE_STATE[$i]}" = "ok" ] || FAILED_PHASES="$FAILED_PHASES ${PHASE_NAMES[$i]}"
+done
+if [ -n "$FAILED_PHASES" ]; then
+  echo ""
+  echo -e "${RED}${BOLD}✗ Install failed:${FAILED_PHASES}${RESET}"
+  echo -e "  Full logs: $LOG_DIR"
+  exit 1
 fi
+rm -rf "$LOG_DIR"
+count_components
 
-# --- Make scripts executable (before cleanup) ---
+# --- Make scripts executable ---
 chmod +x "$REPO_DIR/scripts/"*.sh 2>/dev/null || true
 
-# --- Cleanup temp repo if cloned ---
-[ -n "$CLEANUP_REPO" ] && rm -rf "$CLEANUP_REPO"
-
 # --- Summary ---
 echo ""
 echo -e "${PURPLE}${BOLD}════════════════════════════════════════════════════${RESET}"
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# ============================================================
+#   Claude OS — Component index
+#   One compact JSON file listing every agent, command, skill
+#   and rule (or template) with its name, description,
+#   frontmatter, path, size and content hash, so listings and
+#   catalogs never have to open each file.
+#
+#   Usage:
+#     build-index.py build <claude-dir> [--templates] [--index FILE]
+#     build-index.py counts <claude-dir> [--index FILE]
+#     build-index.py list <claude-dir> [--kind KIND] [--grep TEXT] [--refresh] [--templates]
+#                         [--index FILE]
+#     build-index.py show <claude-dir> <name> [--kind KIND] [--index FILE]
+#
+#   The index lives at <dir>/.claude-os-index.json unless --index
+#   names another file (e.g. for a read-only checkout). Rebuilds
+#   only re-read files whose size or mtime changed.
+# ============================================================
+"""Precompiled index of Claude OS components.
+
+Each item records ``kind``, ``name``, ``description``, the parsed
+frontmatter (``meta``), ``path`` relative to the indexed directory,
+``size``, ``sha256`` and the ``mtime_ns`` used to skip unchanged files.
+
+Kinds in a Claude config dir:
+
+- ``agent``: ``agents/*.md``
+- ``command``: ``commands/**/*.md``, named ``dir:file`` like ``/gsd:help``
+- ``skill``: ``skills/<name>/SKILL.md``
+- ``rule``: ``rules/<lang>/*.md``
+
+With ``--templates`` the directory is a templates dir and every
+``<name>/CLAUDE.md`` is a ``template``.
+
+If the index cannot be written, commands still work from a fresh scan.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+INDEX_NAME = ".claude-os-index.json"
+INDEX_VERSION = 1
+EXCLUDED_DIRS = {".venv", "node_modules", "__pycache__", ".git"}
+DESCRIPTION_MAX = 300
+
+
+def index_path(root, index=None):
+    return index or os.path.join(root, INDEX_NAME)
+
+
+def load_index(root, index=None):
+    """The index for root, or None if it is missing, stale in format, or for another dir."""
+    try:
+        with open(index_path(root, index)) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != INDEX_VERSION or data.get("root") != os.path.abspath(root):
+        return None
+    return data
+
+
+def write_index(root, templates, items, index=None):
+    path = index_path(root, index)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".index.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": INDEX_VERSION, "root": os.path.abspath(root),
+                       "templates": templates, "items": items}, f,
+                      separators=(",", ":"), sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        os.unlink(tmp)
+        raise
+
+
+def parse_frontmatter(text):
+    """Return (meta, body) for a ``---`` delimited block of simple ``key: value`` lines."""
+    if not text.startswith("---"):
+        return {}, text
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}, text
+    meta, key = {}, None
+    for line in text[3:end].splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if line[0] in " \t" and key:
+            # Continuation of a folded or list value.
+            meta[key] = (meta[key] + " " + line.strip().lstrip("- ")).strip()
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            key = None
+            continue
+        key = key.strip()
+        value = value.strip()
+        if value in (">", "|", ">-", "|-"):
+            value = ""
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        meta[key] = value
+    return meta, text[end + 4:].lstrip("\n")
+
+
+def first_paragraph(body):
+    """The first line of prose after headings, used when there is no description."""
+    for line in body.splitlines():
+        line = line.strip()
+        if line and not line.startswith(("#", "```", "---", "|", "<!--")):
+            return line
+    return ""
+
+
+def iter_items(root, templates):
+    """Yield (kind, default_name, relpath) for every indexable file under root."""
+    if templates:
+        for name in sorted(os.listdir(root)):
+            if os.path.isfile(os.path.join(root, name, "CLAUDE.md")):
+                yield "template", name, name + "/CLAUDE.md"
+        return
+    agents = os.path.join(root, "agents")
+    if os.path.isdir(agents):
+        for name in sorted(os.listdir(agents)):
+            if name.endswith(".md") and os.path.isfile(os.path.join(agents, name)):
+                yield "agent", name[:-3], "agents/" + name
+    commands = os.path.join(root, "commands")
+    for dirpath, dirnames, filenames in os.walk(commands):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(".md"):
+                rel = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")
+                yield "command", ":".join(rel[len("commands/"):-3].split("/")), rel
+    skills = os.path.join(root, "skills")
+    if os.path.isdir(skills):
+        for name in sorted(os.listdir(skills)):
+            if os.path.isfile(os.path.join(skills, name, "SKILL.md")):
+                yield "skill", name, "skills/%s/SKILL.md" % name
+    rules = os.path.join(root, "rules")
+    if os.path.isdir(rules):
+        for lang in sorted(os.listdir(rules)):
+            lang_dir = os.path.join(rules, lang)
+            if not os.path.isdir(lang_dir):
+                continue
+            for name in sorted(os.listdir(lang_dir)):
+                if name.endswith(".md"):
+                    yield "rule", "%s/%s" % (lang, name[:-3]), "rules/%s/%s" % (lang, name)
+
+
+def read_item(root, kind, name, rel, st):
+    path = os.path.join(root, rel)
+    with open(path, "rb") as f:
+        data = f.read()
+    meta, body = parse_frontmatter(data.decode("utf-8", "replace"))
+    description = meta.get("description") or first_paragraph(body)
+    if kind in ("agent", "skill") and meta.get("name"):
+        name = meta["name"]
+    return {
+        "kind": kind,
+        "name": name,
+        "description": description[:DESCRIPTION_MAX],
+        "meta": meta,
+        "path": rel,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def build(root, templates=False, index=None):
+    """Refresh the index; return (items, stats). Unchanged files are only stat()ed.
+
+    A failed write (read-only directory) is reported in ``stats["error"]``.
+    """
+    old = load_index(root, index)
+    previous = {}
+    if old and old.get("templates") == templates:
+        previous = {item["path"]: item for item in old["items"]}
+    items = []
+    stats = dict(read=0, unchanged=0, removed=0, error=None)
+    for kind, name, rel in iter_items(root, templates):
+        try:
+            st = os.stat(os.path.join(root, rel))
+        except OSError:
+            continue
+        prev = previous.pop(rel, None)
+        if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            items.append(prev)
+            stats["unchanged"] += 1
+        else:
+            items.append(read_item(root, kind, name, rel, st))
+            stats["read"] += 1
+    stats["removed"] = len(previous)
+    if old is None or stats["read"] or stats["removed"] or old.get("templates") != templates:
+        try:
+            write_index(root, templates, items, index)
+        except OSError as e:
+            stats["error"] = "index not saved: %s" % e
+    return items, stats
+
+
+def load_items(root, refresh=False, templates=None, index=None):
+    """Items from the index, building it first if missing or asked to.
+
+    ``templates=None`` accepts whichever kind of index is already there.
+    """
+    data = load_index(root, index)
+    if templates is None:
+        templates = bool(data and data.get("templates"))
+    if refresh or data is None or data.get("templates") != templates:
+        return build(root, templates, index)[0]
+    return data["items"]
+
+
+def counts(items):
+    """Return (agents, skills, commands, rulesets)."""
+    kinds = [item["kind"] for item in items]
+    rulesets = {item["name"].split("/")[0] for item in items if item["kind"] == "rule"}
+    return kinds.count("agent"), kinds.count("skill"), kinds.count("command"), len(rulesets)
+
+
+def select(items, kind=None, text=None):
+    text = text.lower() if text else None
+    for item in items:
+        if kind and item["kind"] != kind:
+            continue
+        if text and text not in item["name"].lower() and text not in item["description"].lower():
+            continue
+        yield item
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="incrementally rebuild the index")
+    p_build.add_argument("root")
+    p_build.add_argument("--templates", action="store_true", help="index a templates directory")
+
+    p_counts = sub.add_parser("counts", help="print agent/skill/command/rule counts")
+    p_counts.add_argument("root")
+
+    p_list = sub.add_parser("list", help="print name<TAB>description per item")
+    p_list.add_argument("root")
+    p_list.add_argument("--kind")
+    p_list.add_argument("--grep", help="case-insensitive match on name or description")
+    p_list.add_argument("--refresh", action="store_true", help="rebuild before listing")
+    p_list.add_argument("--templates", action="store_true", help="index a templates directory")
+
+    p_show = sub.add_parser("show", help="print the full body of one item")
+    p_show.add_argument("root")
+    p_show.add_argument("name")
+    p_show.add_argument("--kind")
+
+    for p in (p_build, p_counts, p_list, p_show):
+        p.add_argument("--index", help="index file (default: <root>/%s)" % INDEX_NAME)
+
+    args = parser.parse_args(argv)
+    if args.cmd == "build":
+        items, s = build(args.root, args.templates, args.index)
+        print(f"{len(items)} indexed: {s['read']} read, {s['unchanged']} unchanged, "
+              f"{s['removed']} removed")
+        if s["error"]:
+            print(s["error"], file=sys.stderr)
+    elif args.cmd == "counts":
+        print(*counts(load_items(args.root, index=args.index)))
+    elif args.cmd == "list":
+        items = load_items(args.root, args.refresh, args.templates or None, args.index)
+        for item in select(items, args.kind, args.grep):
+            label = item["name"] if args.kind else "%s\t%s" % (item["kind"], item["name"])
+            print("%s\t%s" % (label, item["description"]))
+    else:
+        matches = [item for item in select(load_items(args.root, index=args.index), args.kind)
+                   if item["name"] == args.name]
+        if not matches:
+            print(f"no such item: {args.name}", file=sys.stderr)
+            return 1
+        with open(os.path.join(args.root, matches[0]["path"])) as f:
+            sys.stdout.write(f.read())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# ============================================================
+#   Claude OS — Content-addressed file store
+#   Keeps one copy of every template, agent, command and skill
+#   file and clones it into projects, so scaffolding many
+#   projects on a copy-on-write filesystem costs (almost) no
+#   extra disk.
+#
+#   Usage:
+#     cas-store.py link <src-dir> <dest-dir> [--mode auto|reflink|hard|symlink|copy]
+#                       [--project DIR]
+#     cas-store.py detach <path> ...     Give files a private, writable copy
+#     cas-store.py gc [--dry-run]        Delete blobs no project links to
+#     cas-store.py verify                Drop blobs whose content was modified
+#     cas-store.py stats
+#
+#   Store: $CLAUDE_OS_STORE (default ~/.local/share/claude-os/store)
+# ============================================================
+"""Content-addressed store for project scaffolding.
+
+Files are stored once under ``blobs/<sha256[:2]>/<sha256[2:]>`` and linked
+into projects:
+
+- ``reflink``: a copy-on-write clone (APFS, Btrfs, XFS). Edits never touch the store.
+- ``copy``: a plain copy.
+- ``hard``: a hard link to the blob. Not copy-on-write: read-only permissions
+  don't stop root, ``chmod`` or editors that save in place, and any of those
+  changes the file in every project. Opt-in only; ``detach`` files before
+  editing them.
+- ``symlink``: a link to the blob path, with the same caveats as ``hard``.
+
+``auto`` uses reflink when the store and the destination support it, and
+otherwise copies straight from the source without touching the store: a
+plain copy of a blob saves no disk, so importing would only add I/O and
+blobs nothing links to. On such filesystems (ext4, overlayfs) only ``hard``
+and ``symlink`` share storage, with the caveats above.
+
+Projects that use the store are recorded in ``projects.json`` so ``gc`` can
+find blobs that are still symlinked.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+
+STORE = os.environ.get("CLAUDE_OS_STORE") or os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "claude-os", "store")
+BLOBS = os.path.join(STORE, "blobs")
+PROJECTS = os.path.join(STORE, "projects.json")
+SKIP_DIRS = {".git", "node_modules", ".venv", "__pycache__"}
+MODES = ("auto", "reflink", "hard", "symlink", "copy")
+SHARED_MODES = ("hard", "symlink")  # every project points at the same blob
+
+FICLONE = 0x40049409  # linux/fs.h
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def blob_path(digest):
+    return os.path.join(BLOBS, digest[:2], digest[2:])
+
+
+def import_file(path):
+    """Add a file to the store (if new) and return its blob path."""
+    digest = file_hash(path)
+    blob = blob_path(digest)
+    if not os.path.exists(blob):
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(blob), prefix=".import.")
+        os.close(fd)
+        shutil.copyfile(path, tmp)
+        executable = os.stat(path).st_mode & stat.S_IXUSR
+        os.chmod(tmp, 0o555 if executable else 0o444)
+        os.replace(tmp, blob)
+    return blob
+
+
+def reflink(src, dest):
+    if sys.platform == "darwin":
+        subprocess.run(["cp", "-c", src, dest], check=True, capture_output=True)
+        return
+    import fcntl
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def can_reflink(dest):
+    """Whether files in the store can be cloned into dest."""
+    os.makedirs(STORE, exist_ok=True)
+    os.makedirs(dest, exist_ok=True)
+    fd, probe = tempfile.mkstemp(dir=STORE, prefix=".probe.")
+    os.write(fd, b"probe")
+    os.close(fd)
+    clone = os.path.join(dest, ".cas-probe-%d" % os.getpid())
+    try:
+        reflink(probe, clone)
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    finally:
+        os.unlink(probe)
+        if os.path.lexists(clone):
+            os.unlink(clone)
+
+
+def materialize(blob, dest, mode):
+    """Create dest from blob as a reflink, hard link or symlink."""
+    tmp = os.path.join(os.path.dirname(dest), ".cas-%d-%s" % (os.getpid(), os.path.basename(dest)))
+    try:
+        if mode == "reflink":
+            reflink(blob, tmp)
+            os.chmod(tmp, os.stat(blob).st_mode | stat.S_IWUSR)
+        elif mode == "hard":
+            os.link(blob, tmp)
+        else:
+            os.symlink(blob, tmp)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+    os.replace(tmp, dest)
+
+
+def load_projects():
+    try:
+        with open(PROJECTS) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_projects(projects):
+    os.makedirs(STORE, exist_ok=True)
+    tmp = PROJECTS + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(sorted(set(projects)), f, indent=2)
+    os.replace(tmp, PROJECTS)
+
+
+def walk_files(root):
+    """Yield files and symlinks (including symlinks to directories) under root."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            yield os.path.join(dirpath, name)
+        for name in dirnames:
+            # os.walk doesn't descend into these; report the link itself
+            if os.path.islink(os.path.join(dirpath, name)):
+                yield os.path.join(dirpath, name)
+
+
+def link_tree(src, dest, mode, project):
+    if mode == "auto":
+        mode = "reflink" if can_reflink(dest) else "copy"
+    used = {}
+    for path in walk_files(src):
+        target = os.path.join(dest, os.path.relpath(path, src))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.islink(path):
+            if os.path.lexists(target):
+                os.unlink(target)
+            os.symlink(os.readlink(path), target)
+            continue
+        if mode == "copy":
+            shutil.copy2(path, target)
+        else:
+            materialize(import_file(path), target, mode)
+        used[mode] = used.get(mode, 0) + 1
+    if mode != "copy":
+        save_projects(load_projects() + [os.path.abspath(project or dest)])
+    return used
+
+
+def detach(paths):
+    for path in paths:
+        files = walk_files(path) if os.path.isdir(path) and not os.path.islink(path) else [path]
+        for f in files:
+            st = os.lstat(f)
+            if stat.S_ISLNK(st.st_mode) and not os.path.realpath(f).startswith(BLOBS + os.sep):
+                continue
+            if not stat.S_ISLNK(st.st_mode) and st.st_nlink < 2:
+                continue
+            source = os.path.realpath(f)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(f), prefix=".detach.")
+            os.close(fd)
+            shutil.copyfile(source, tmp)
+            os.chmod(tmp, os.stat(source).st_mode | stat.S_IWUSR)
+            os.replace(tmp, f)
+            print("detached", f)
+
+
+def gc(dry_run):
+    """Remove blobs that are neither hard-linked nor symlinked from a live project."""
+    projects = [p for p in load_projects() if os.path.isdir(p)]
+    symlinked = set()
+    for project in projects:
+        for path in walk_files(project):
+            if os.path.islink(path):
+                real = os.path.realpath(path)
+                if real.startswith(BLOBS + os.sep):
+                    symlinked.add(real)
+    removed = freed = kept = 0
+    for path in walk_files(BLOBS) if os.path.isdir(BLOBS) else []:
+        st = os.stat(path)
+        if st.st_nlink > 1 or path in symlinked:
+            kept += 1
+            continue
+        removed += 1
+        freed += st.st_size
+        if not dry_run:
+            os.unlink(path)
+    if not dry_run:
+        save_projects(projects)
+    verb = "would remove" if dry_run else "removed"
+    print("%s %d blobs (%.1f KiB), kept %d, %d live projects"
+          % (verb, removed, freed / 1024, kept, len(projects)))
+
+
+def verify():
+    """Re-hash every blob and drop the ones that were written through a link."""
+    bad = 0
+    for path in walk_files(BLOBS) if os.path.isdir(BLOBS) else []:
+        digest = os.path.basename(os.path.dirname(path)) + os.path.basename(path)
+        if file_hash(path) != digest:
+            # Projects keep their (edited) file; new links get a fresh blob.
+            os.unlink(path)
+            bad += 1
+            print("dropped modified blob", digest)
+    print("%d modified blobs dropped" % bad)
+    return 1 if bad else 0
+
+
+def stats():
+    blobs = size = 0
+    for path in walk_files(BLOBS) if os.path.isdir(BLOBS) else []:
+        blobs += 1
+        size += os.stat(path).st_size
+    print("store:    %s" % STORE)
+    print("blobs:    %d (%.1f KiB)" % (blobs, size / 1024))
+    print("projects: %d" % len(load_projects()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_link = sub.add_parser("link", help="link a directory tree into a project through the store")
+    p_link.add_argument("src")
+    p_link.add_argument("dest")
+    p_link.add_argument("--mode", choices=MODES, default="auto")
+    p_link.add_argument("--project", help="project root to register for gc (default: dest)")
+    p_detach = sub.add_parser("detach", help="replace linked files with private writable copies")
+    p_detach.add_argument("paths", nargs="+")
+    p_gc = sub.add_parser("gc", help="delete blobs no registered project uses")
+    p_gc.add_argument("--dry-run", action="store_true")
+    sub.add_parser("verify", help="drop blobs whose content no longer matches their hash")
+    sub.add_parser("stats", help="show store size")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "link":
+        if args.mode in SHARED_MODES:
+            sys.stderr.write(
+                "warning: --mode %s shares one file between all projects. Writes as root, chmod\n"
+                "and editors that save in place change it everywhere; run `cas-store.py detach`\n"
+                "on a file before editing it.\n" % args.mode)
+        used = link_tree(args.src, args.dest, args.mode, args.project)
+        print(", ".join("%d %s" % (n, k) for k, n in sorted(used.items())) or "0 files")
+    elif args.cmd == "detach":
+        detach(args.paths)
+    elif args.cmd == "gc":
+        gc(args.dry_run)
+    elif args.cmd == "verify":
+        return verify()
+    else:
+        stats()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+# ============================================================
+#   Claude OS — Google Search Console query cache
+#   Sits between Claude and `python3 -m mcp_gsc` and answers
+#   repeated read-only tool calls (same site, date range,
+#   dimensions) from a local SQLite file instead of the API.
+#
+#   Usage:
+#     gsc-cache.py register [server] [--max-mb N]
+#     gsc-cache.py unregister [server]
+#     gsc-cache.py proxy [--max-mb N] -- <command> [args]  (the mcpServers command)
+#     gsc-cache.py prefetch --site URL [--days N] [--server gsc]
+#     gsc-cache.py stats | clear [--site URL]
+#
+#   Cache: $CLAUDE_CONFIG_DIR/mcp/gsc-cache.sqlite
+# ============================================================
+"""Caching MCP proxy for the Search Console server.
+
+``register`` wraps the ``gsc`` entry in ``gsc-cache.py proxy --``. The
+proxy starts the real server and relays JSON-RPC on stdio. For
+read-only ``tools/call`` requests (``get_*``, ``list_*``, ``inspect_*``
+and similar):
+
+- The key is the tool name plus normalized arguments: sorted keys,
+  canonical site URL, trimmed dimension lists, ISO dates. Relative
+  windows (``days``) also include today's date.
+- TTLs follow data freshness. Ranges ending in the last few days (still
+  being revised by Google) expire within the hour; ranges that are final
+  are kept for a week.
+- The file is bounded by ``--max-mb``; least recently used entries go first.
+- Identical calls already in flight share one upstream request.
+- Mutating tools (``add_*``, ``delete_*``, ``submit_*``...) pass
+  through and drop the cached entries for their site.
+- Errors are never cached, whether flagged ``isError`` or returned as
+  text starting with ``Error`` (how mcp_gsc reports API failures).
+
+``prefetch`` runs the server once and sends the common report shapes for
+a site in one pipelined batch, so an audit starts warm.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+
+CLAUDE_DIR = os.environ.get("CLAUDE_CONFIG_DIR") or os.path.expanduser("~/.claude")
+STATE_DIR = os.path.join(CLAUDE_DIR, "mcp")
+DB_PATH = os.environ.get("GSC_CACHE_DB") or os.path.join(STATE_DIR, "gsc-cache.sqlite")
+INSTALLED_PATH = os.path.join(STATE_DIR, "gsc-cache.py")
+
+DEFAULT_SERVER = "gsc"
+DEFAULT_MAX_MB = 64
+PREFETCH_TIMEOUT = 300
+
+CACHEABLE = ("get_", "list_", "inspect_", "compare_", "check_", "batch_url_inspection")
+MUTATING = ("add_", "delete_", "submit_", "manage_", "remove_", "reauthenticate")
+# mcp_gsc catches API, quota and auth exceptions and returns them as plain text
+# ("Error retrieving search analytics: ...") rather than as isError results.
+ERROR_PREFIXES = ("Error", "error:")
+
+# Search Console keeps revising the last ~3 days of data.
+HOUR, DAY = 3600, 86400
+TTL_PROVISIONAL = HOUR        # range ends within PROVISIONAL_DAYS of today
+TTL_RECENT = 6 * HOUR         # range ends within RECENT_DAYS of today
+TTL_FINAL = 7 * DAY           # range is entirely in finalized data
+TTL_STATIC = 6 * HOUR         # no date range: properties, sitemaps, inspections
+PROVISIONAL_DAYS = 3
+RECENT_DAYS = 7
+
+DATE_KEYS = re.compile(r"(^|_)(date|start|end)($|_)")
+DIMENSION_KEYS = ("dimensions", "dimension")
+
+PREFETCH_SHAPES = [
+    ("list_properties", {}),
+    ("get_site_details", {"site_url": "{site}"}),
+    ("get_sitemaps", {"site_url": "{site}"}),
+    ("get_performance_overview", {"site_url": "{site}", "days": "{days}"}),
+    ("get_search_analytics", {"site_url": "{site}", "days": "{days}", "dimensions": "query"}),
+    ("get_search_analytics", {"site_url": "{site}", "days": "{days}", "dimensions": "page"}),
+    ("get_search_analytics", {"site_url": "{site}", "days": "{days}", "dimensions": "query,page"}),
+    ("get_search_analytics", {"site_url": "{site}", "days": "{days}", "dimensions": "device"}),
+    ("get_search_analytics", {"site_url": "{site}", "days": "{days}", "dimensions": "country"}),
+    ("get_search_analytics", {"site_url": "{site}", "days": "{days}", "dimensions": "date"}),
+]
+
+
+def claude_desktop_config():
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Claude/claude_desktop_config.json")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "claude", "claude_desktop_config.json")
+
+
+def load_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def save_json(path, data, mode=0o600):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+
+
+def log(msg):
+    sys.stderr.write("gsc-cache: " + msg + "\n")
+    sys.stderr.flush()
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+
+def today():
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+# ------------------------------------------------------------
+#   Keys and TTLs
+# ------------------------------------------------------------
+
+def is_cacheable(tool):
+    return tool.startswith(CACHEABLE) and not tool.startswith(MUTATING)
+
+
+def is_success(msg):
+    """A response worth caching: a result that is neither flagged nor worded as an error."""
+    result = msg.get("result")
+    if not isinstance(result, dict) or result.get("isError"):
+        return False
+    content = result.get("content") or [{}]
+    first = content[0] if isinstance(content[0], dict) else {}
+    return not (first.get("type") == "text"
+                and first.get("text", "").lstrip().startswith(ERROR_PREFIXES))
+
+
+def normalize_site(value):
+    value = value.strip()
+    if value.lower().startswith("sc-domain:"):
+        return "sc-domain:" + value[len("sc-domain:"):].strip().lower()
+    u = urllib.parse.urlsplit(value)
+    if not u.scheme:
+        return value.lower()
+    path = u.path or "/"
+    return urllib.parse.urlunsplit((u.scheme.lower(), u.netloc.lower(), path, u.query, ""))
+
+
+def normalize_date(value):
+    try:
+        return datetime.date.fromisoformat(value.strip()[:10]).isoformat()
+    except ValueError:
+        return value.strip()
+
+
+def normalize_value(key, value):
+    key = key.lower()
+    if isinstance(value, str):
+        if key in ("site_url", "siteurl", "site", "property"):
+            return normalize_site(value)
+        if key in DIMENSION_KEYS:
+            return ",".join(d.strip().lower() for d in value.split(",") if d.strip())
+        if DATE_KEYS.search(key):
+            return normalize_date(value)
+        if key.endswith("url"):
+            return value.strip()
+        value = value.strip()
+        # "28" and 28 mean the same thing to the server.
+        return int(value) if value.isdigit() else value
+    if isinstance(value, list):
+        if key in DIMENSION_KEYS:
+            return ",".join(str(d).strip().lower() for d in value)
+        return [normalize_value(key, v) for v in value]
+    if isinstance(value, dict):
+        return normalize_args(value)
+    return value
+
+
+def normalize_args(args):
+    return {k.lower(): normalize_value(k, v) for k, v in sorted((args or {}).items())
+            if v is not None}
+
+
+def site_of(args):
+    for key in ("site_url", "siteurl", "site", "property"):
+        if isinstance(args.get(key), str):
+            return args[key]
+    return ""
+
+
+def cache_key(tool, args):
+    """Return (key, normalized args) for a tool call."""
+    norm = normalize_args(args)
+    if "days" in norm:
+        # A relative window moves every day.
+        norm["_as_of"] = today().isoformat()
+    blob = json.dumps([tool, norm], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest(), norm
+
+
+def ttl_for(norm, now_date=None):
+    """Seconds to keep a result, based on how fresh its date range is."""
+    now_date = now_date or today()
+    end = None
+    if "days" in norm:
+        end = now_date
+    for key, value in norm.items():
+        if DATE_KEYS.search(key) and "start" not in key and isinstance(value, str):
+            try:
+                d = datetime.date.fromisoformat(value)
+            except ValueError:
+                continue
+            end = d if end is None else max(end, d)
+    if end is None:
+        return TTL_STATIC
+    age = (now_date - end).days
+    if age <= PROVISIONAL_DAYS:
+        return TTL_PROVISIONAL
+    if age <= RECENT_DAYS:
+        return TTL_RECENT
+    return TTL_FINAL
+
+
+# ------------------------------------------------------------
+#   Store
+# ------------------------------------------------------------
+
+class Cache:
+    """SQLite store shared by every proxy process."""
+
+    def __init__(self, path=DB_PATH, max_bytes=DEFAULT_MAX_MB << 20):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.max_bytes = max_bytes
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, tool TEXT, site TEXT, args TEXT,
+                    result BLOB, size INTEGER, created REAL, expires REAL,
+                    last_used REAL, hits INTEGER DEFAULT 0);
+                CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used);
+                CREATE INDEX IF NOT EXISTS entries_site ON entries(site);
+                CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+            """)
+        os.chmod(path, 0o600)
+
+    def _count(self, *names):
+        for name in names:
+            self.db.execute("INSERT INTO counters VALUES (?, 1) "
+                            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key, tool):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT result, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                self.db.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+                self._count("hits", "hits:" + tool)
+                return json.loads(zlib.decompress(row[0]))
+            if row:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count("expired")
+            self._count("misses", "misses:" + tool)
+            return None
+
+    def fresh(self, key):
+        """True if key has an unexpired entry (no counters touched)."""
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM entries WHERE key = ? AND expires > ?",
+                                   (key, time.time())).fetchone() is not None
+
+    def put(self, key, tool, norm, result):
+        data = zlib.compress(json.dumps(result, separators=(",", ":")).encode())
+        now = time.time()
+        site = site_of(norm)
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                            (key, tool, site, json.dumps(norm, sort_keys=True), data, len(data),
+                             now, now + ttl_for(norm), now))
+            self._count("stores")
+            self._evict()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self.db.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        target = self.max_bytes * 0.9
+        rows = self.db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        total = sum(size for _, size in rows)
+        doomed = []
+        for key, size in rows:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        for _ in doomed:
+            self._count("evictions")
+
+    def invalidate(self, site=None):
+        with self.lock:
+            if site is None:
+                cur = self.db.execute("DELETE FROM entries")
+            else:
+                cur = self.db.execute("DELETE FROM entries WHERE site = ?", (normalize_site(site),))
+            return cur.rowcount
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.db.execute("SELECT name, value FROM counters"))
+            entries, size = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            live = self.db.execute("SELECT COUNT(*) FROM entries WHERE expires > ?",
+                                   (time.time(),)).fetchone()[0]
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        tools = sorted({name.split(":", 1)[1] for name in counters if ":" in name})
+        return {
+            "hits": hits, "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "stores": counters.get("stores", 0), "coalesced": counters.get("coalesced", 0),
+            "expired": counters.get("expired", 0), "evictions": counters.get("evictions", 0),
+            "invalidated": counters.get("invalidated", 0),
+            "entries": entries, "live_entries": live, "bytes": size, "max_bytes": self.max_bytes,
+            "tools": {t: {"hits": counters.get("hits:" + t, 0), "misses": counters.get("misses:" + t, 0)}
+                      for t in tools},
+        }
+
+    def count(self, name, n=1):
+        with self.lock:
+            for _ in range(n):
+                self._count(name)
+
+
+# ------------------------------------------------------------
+#   Proxy
+# ------------------------------------------------------------
+
+class Proxy:
+    """Relay stdio JSON-RPC to the real server, answering cached calls locally."""
+
+    def __init__(self, command, cache):
+        self.cache = cache
+        self.proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.out_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.pending = {}    # upstream id -> (key, tool, norm) for cache misses
+        self.inflight = {}   # key -> [client ids waiting on the same call]
+        self.mutations = {}  # upstream id -> site
+        self.cancelled = set()  # upstream ids whose caller cancelled: don't relay the response
+
+    def send_client(self, msg):
+        with self.out_lock:
+            sys.stdout.buffer.write(encode(msg))
+            sys.stdout.buffer.flush()
+
+    def send_server(self, line):
+        self.proc.stdin.write(line if line.endswith(b"\n") else line + b"\n")
+        self.proc.stdin.flush()
+
+    def from_client(self, line):
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            self.send_server(line)
+            return
+        if isinstance(msg, dict) and msg.get("method") == "notifications/cancelled":
+            if not self.cancel((msg.get("params") or {}).get("requestId")):
+                return
+        if not isinstance(msg, dict) or msg.get("method") != "tools/call" or "id" not in msg:
+            self.send_server(line)
+            return
+        params = msg.get("params") or {}
+        tool = params.get("name", "")
+        args = params.get("arguments") or {}
+        if tool.startswith(MUTATING):
+            with self.lock:
+                self.mutations[msg["id"]] = site_of(args)
+            self.send_server(line)
+            return
+        if not is_cacheable(tool):
+            self.send_server(line)
+            return
+        key, norm = cache_key(tool, args)
+        result = self.cache.get(key, tool)
+        if result is not None:
+            self.send_client({"jsonrpc": "2.0", "id": msg["id"], "result": result})
+            return
+        with self.lock:
+            waiting = self.inflight.get(key)
+            if waiting is not None:
+                # Same call already on its way upstream: answer both from one response.
+                waiting.append(msg["id"])
+                self.cache.count("coalesced")
+                return
+            self.inflight[key] = []
+            self.pending[msg["id"]] = (key, tool, norm)
+        self.send_server(line)
+
+    def cancel(self, request_id):
+        """Handle a client's cancellation; return whether to forward it upstream.
+
+        A cancelled waiter is just dropped. A cancelled leader with waiters
+        keeps its upstream call running for them, and its own response is
+        swallowed. A leader nobody else waits on is forgotten and the
+        cancellation goes to the server, so the next identical call starts
+        a new request instead of waiting on this one.
+        """
+        with self.lock:
+            for waiting in self.inflight.values():
+                if request_id in waiting:
+                    waiting.remove(request_id)
+                    return False
+            entry = self.pending.get(request_id)
+            if entry is None:
+                return True
+            self.cancelled.add(request_id)
+            if self.inflight.get(entry[0]):
+                return False
+            del self.pending[request_id]
+            self.inflight.pop(entry[0], None)
+            return True
+
+    def from_server(self, line):
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            msg = None
+        if not isinstance(msg, dict) or "method" in msg or "id" not in msg:
+            with self.out_lock:
+                sys.stdout.buffer.write(line)
+                sys.stdout.buffer.flush()
+            return
+        with self.lock:
+            entry = self.pending.pop(msg["id"], None)
+            waiters = self.inflight.pop(entry[0], []) if entry else []
+            mutated = self.mutations.pop(msg["id"], None)
+            cancelled = msg["id"] in self.cancelled
+            self.cancelled.discard(msg["id"])
+        ok = is_success(msg)
+        if entry and ok:
+            self.cache.put(entry[0], entry[1], entry[2], msg["result"])
+        if mutated is not None and ok:
+            dropped = self.cache.invalidate(mutated or None)
+            self.cache.count("invalidated", dropped)
+        with self.out_lock:
+            if not cancelled:
+                sys.stdout.buffer.write(line)
+            for client_id in waiters:
+                sys.stdout.buffer.write(encode(dict(msg, id=client_id)))
+            sys.stdout.buffer.flush()
+
+    def run(self):
+        def upstream():
+            for line in sys.stdin.buffer:
+                if line.strip():
+                    self.from_client(line)
+            self.proc.stdin.close()
+
+        threading.Thread(target=upstream, daemon=True).start()
+        for line in self.proc.stdout:
+            self.from_server(line)
+        return self.proc.wait()
+
+
+# ------------------------------------------------------------
+#   Prefetch
+# ------------------------------------------------------------
+
+def server_spec(name):
+    """The real (unwrapped) launch command and env of a configured server."""
+    entry = load_json(claude_desktop_config(), {}).get("mcpServers", {}).get(name)
+    if entry is None:
+        raise SystemExit("No mcpServers entry named '%s' in %s" % (name, claude_desktop_config()))
+    command = [entry["command"]] + entry.get("args", [])
+    if INSTALLED_PATH in command[:2] and "--" in command:
+        command = command[command.index("--") + 1:]
+    return command, dict(os.environ, **entry.get("env", {}))
+
+
+def fill(template, site, days):
+    return {k: (site if v == "{site}" else days if v == "{days}" else v) for k, v in template.items()}
+
+
+def prefetch(cache, site, days, name):
+    """Warm the cache with the common report shapes, in one pipelined batch."""
+    command, env = server_spec(name)
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+    responses = {}
+
+    def reader():
+        for line in proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(msg, dict) and "id" in msg and "method" not in msg:
+                responses[msg["id"]] = msg
+
+    threading.Thread(target=reader, daemon=True).start()
+
+    def call(msg):
+        proc.stdin.write(encode(msg))
+        proc.stdin.flush()
+
+    def wait_for(ids, timeout):
+        deadline = time.monotonic() + timeout
+        while not set(ids) <= set(responses) and proc.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+    try:
+        call({"jsonrpc": "2.0", "id": "init", "method": "initialize", "params": {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": "gsc-cache-prefetch", "version": "1"}}})
+        wait_for({"init"}, 60)
+        if "result" not in responses.get("init", {}):
+            raise SystemExit("gsc-cache: server did not initialize")
+        call({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        call({"jsonrpc": "2.0", "id": "tools", "method": "tools/list", "params": {}})
+        wait_for({"tools"}, 60)
+        schemas = {t["name"]: set((t.get("inputSchema") or {}).get("properties", {}))
+                   for t in responses.get("tools", {}).get("result", {}).get("tools", [])}
+
+        batch = {}
+        skipped = cached = 0
+        for tool, template in PREFETCH_SHAPES:
+            args = fill(template, site, days)
+            if tool not in schemas or not set(args) <= schemas[tool]:
+                skipped += 1
+                continue
+            key, norm = cache_key(tool, args)
+            if cache.fresh(key):
+                cached += 1
+                continue
+            call_id = "p%d" % len(batch)
+            batch[call_id] = (key, tool, norm)
+            call({"jsonrpc": "2.0", "id": call_id, "method": "tools/call",
+                  "params": {"name": tool, "arguments": args}})
+        wait_for(set(batch), PREFETCH_TIMEOUT)
+
+        stored = failed = 0
+        for call_id, (key, tool, norm) in batch.items():
+            msg = responses.get(call_id, {})
+            if is_success(msg):
+                cache.put(key, tool, norm, msg["result"])
+                stored += 1
+            else:
+                failed += 1
+                log("%s failed: %s" % (tool, msg.get("error") or msg.get("result") or "timeout"))
+        print("prefetched %d reports (%d already cached, %d failed, %d not offered by the server)"
+              % (stored, cached, failed, skipped))
+        return 1 if failed else 0
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# ------------------------------------------------------------
+#   Config
+# ------------------------------------------------------------
+
+def register(name, max_mb):
+    desktop_path = claude_desktop_config()
+    desktop = load_json(desktop_path, {"mcpServers": {}})
+    entry = desktop.get("mcpServers", {}).get(name)
+    if entry is None:
+        raise SystemExit("No mcpServers entry named '%s' in %s" % (name, desktop_path))
+    args = entry.get("args", [])
+    inner = args[args.index("--") + 1:] if args[:2] == [INSTALLED_PATH, "proxy"] else [entry["command"]] + args
+    os.makedirs(STATE_DIR, exist_ok=True)
+    if os.path.abspath(__file__) != INSTALLED_PATH:
+        shutil.copy2(os.path.abspath(__file__), INSTALLED_PATH)
+    entry["command"] = sys.executable
+    entry["args"] = [INSTALLED_PATH, "proxy", "--max-mb", str(max_mb), "--"] + inner
+    save_json(desktop_path, desktop)
+    print("%s now answers repeated queries from %s (max %d MB)" % (name, DB_PATH, max_mb))
+
+
+def unregister(name):
+    desktop_path = claude_desktop_config()
+    desktop = load_json(desktop_path, {"mcpServers": {}})
+    entry = desktop.get("mcpServers", {}).get(name)
+    args = (entry or {}).get("args", [])
+    if args[:2] != [INSTALLED_PATH, "proxy"]:
+        raise SystemExit("'%s' is not behind gsc-cache" % name)
+    inner = args[args.index("--") + 1:]
+    entry["command"], entry["args"] = inner[0], inner[1:]
+    save_json(desktop_path, desktop)
+    print("%s restored to a direct launch" % name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_reg = sub.add_parser("register", help="put the cache in front of a configured server")
+    p_reg.add_argument("server", nargs="?", default=DEFAULT_SERVER)
+    p_reg.add_argument("--max-mb", type=int, default=DEFAULT_MAX_MB)
+    p_unreg = sub.add_parser("unregister", help="restore the server's direct launch")
+    p_unreg.add_argument("server", nargs="?", default=DEFAULT_SERVER)
+    p_proxy = sub.add_parser("proxy", help="stdio proxy used as the mcpServers command")
+    p_proxy.add_argument("--max-mb", type=int, default=DEFAULT_MAX_MB)
+    p_proxy.add_argument("command", nargs=argparse.REMAINDER)
+    p_pre = sub.add_parser("prefetch", help="warm the cache with common reports for a site")
+    p_pre.add_argument("--site", required=True, help="property, e.g. https://example.com/ or sc-domain:example.com")
+    p_pre.add_argument("--days", type=int, default=28)
+    p_pre.add_argument("--server", default=DEFAULT_SERVER)
+    p_pre.add_argument("--max-mb", type=int, default=DEFAULT_MAX_MB)
+    sub.add_parser("stats", help="print hit/miss counters and cache size as JSON")
+    p_clear = sub.add_parser("clear", help="drop cached results")
+    p_clear.add_argument("--site")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "register":
+        register(args.server, args.max_mb)
+    elif args.cmd == "unregister":
+        unregister(args.server)
+    elif args.cmd == "proxy":
+        command = args.command[1:] if args.command[:1] == ["--"] else args.command
+        if not command:
+            raise SystemExit("Usage: gsc-cache.py proxy [--max-mb N] -- <command> [args]")
+        return Proxy(command, Cache(max_bytes=args.max_mb << 20)).run()
+    elif args.cmd == "prefetch":
+        return prefetch(Cache(max_bytes=args.max_mb << 20), args.site, args.days, args.server)
+    elif args.cmd == "stats":
+        print(json.dumps(Cache().stats(), indent=2))
+    else:
+        print("cleared %d entries" % Cache().invalidate(args.site))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
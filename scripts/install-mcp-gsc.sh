@@ -5,6 +5,17 @@
 # ============================================================
 set -euo pipefail
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SUPERVISED=0
+CACHED=0
+for arg in "$@"; do
+  case "$arg" in
+    --supervised) SUPERVISED=1 ;;  # share one warm server across sessions (scripts/mcp-supervisor.py)
+    --cache) CACHED=1 ;;           # answer repeated queries from a local SQLite cache (scripts/gsc-cache.py)
+    *) echo "Usage: $0 [--supervised] [--cache]"; exit 1 ;;
+  esac
+done
+
 GREEN='\033[0;32m'; CYAN='\033[0;36m'; YELLOW='\033[1;33m'; RED='\033[0;31m'; RESET='\033[0m'
 
 # Detect config path by OS
@@ -67,6 +78,13 @@ with open(config_path, "w") as f:
 
 chmod 600 "$CLAUDE_CONFIG"
 
+if [ "$CACHED" = "1" ]; then
+  python3 "$SCRIPT_DIR/gsc-cache.py" register gsc
+fi
+if [ "$SUPERVISED" = "1" ]; then
+  python3 "$SCRIPT_DIR/mcp-supervisor.py" register gsc
+fi
+
 echo -e "${GREEN}Done! Restart Claude to activate GSC MCP.${RESET}"
 echo ""
 echo "Claude will now be able to:"
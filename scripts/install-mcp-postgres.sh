@@ -5,6 +5,19 @@
 # ============================================================
 set -euo pipefail
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PINNED=0
+SUPERVISED=0
+POOLED=0
+for arg in "$@"; do
+  case "$arg" in
+    --pinned) PINNED=1 ;;          # exec a locally installed, version-locked server (scripts/mcp-pin.sh)
+    --supervised) SUPERVISED=1 ;;  # share one warm server across sessions (scripts/mcp-supervisor.py)
+    --pool) POOLED=1 ;;            # connect through a local connection pool (scripts/pg-pool.py)
+    *) echo "Usage: $0 [--pinned] [--supervised] [--pool]"; exit 1 ;;
+  esac
+done
+
 GREEN='\033[0;32m'; CYAN='\033[0;36m'; YELLOW='\033[1;33m'; RED='\033[0;31m'; RESET='\033[0m'
 
 # Detect config path by OS
@@ -52,6 +65,16 @@ with open(config_path, "w") as f:
 
 chmod 600 "$CLAUDE_CONFIG"
 
+if [ "$PINNED" = "1" ]; then
+  "$SCRIPT_DIR/mcp-pin.sh" register postgresql
+fi
+if [ "$POOLED" = "1" ]; then
+  python3 "$SCRIPT_DIR/pg-pool.py" register postgresql
+fi
+if [ "$SUPERVISED" = "1" ]; then
+  python3 "$SCRIPT_DIR/mcp-supervisor.py" register postgresql
+fi
+
 echo -e "${GREEN}Done! Restart Claude to activate PostgreSQL MCP.${RESET}"
 echo ""
 echo "Claude will now be able to:"
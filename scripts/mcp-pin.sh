@@ -0,0 +1,370 @@
+#!/usr/bin/env bash
+# ============================================================
+#   Claude OS — Pinned MCP servers
+#   Installs exact versions of the npx-launched MCP servers into
+#   a local prefix and points Claude at their entry points, so
+#   launching a server is a plain `node <file>` with no package
+#   resolution.
+#
+#   Usage:
+#     ./scripts/mcp-pin.sh install  [server ...]  Install locked (or latest) versions
+#     ./scripts/mcp-pin.sh upgrade  [server ...]  Move servers to @latest, update lock
+#     ./scripts/mcp-pin.sh verify                 Check installs match the lockfile
+#     ./scripts/mcp-pin.sh register <server>      Point the Claude config entry at the pin
+#     ./scripts/mcp-pin.sh launch   <server>      Print the resolved {command, args}
+#     ./scripts/mcp-pin.sh exec     <server> [args] Run the pinned server directly
+#
+#   Servers are the npx entries in mcp-configs/ (desktop-commander,
+#   github, postgresql). Versions are locked in
+#   $CLAUDE_CONFIG_DIR/mcp/mcp-lock.json, together with npm's
+#   package-lock.json for the whole dependency tree; copy that file
+#   to other machines and `install` reproduces the tree with `npm ci`.
+# ============================================================
+set -euo pipefail
+
+GREEN='\033[0;32m'; CYAN='\033[0;36m'; YELLOW='\033[1;33m'; RED='\033[0;31m'; RESET='\033[0m'
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+REPO_DIR="$(dirname "$SCRIPT_DIR")"
+CLAUDE_DIR="${CLAUDE_CONFIG_DIR:-$HOME/.claude}"
+PREFIX="$CLAUDE_DIR/mcp"
+LOCK_FILE="$PREFIX/mcp-lock.json"
+# Launch specs of servers running behind scripts/mcp-supervisor.py
+SUPERVISOR_CONFIG="$PREFIX/supervisor.json"
+
+# Detect config path by OS
+if [[ "$OSTYPE" == "darwin"* ]]; then
+  CLAUDE_CONFIG="$HOME/Library/Application Support/Claude/claude_desktop_config.json"
+else
+  CLAUDE_CONFIG="${XDG_CONFIG_HOME:-$HOME/.config}/claude/claude_desktop_config.json"
+fi
+
+CMD="${1:-}"
+[ $# -gt 0 ] && shift
+
+# Print "server package" for every npx-launched config in mcp-configs/
+known_servers() {
+  MCP_CONFIGS_DIR="$REPO_DIR/mcp-configs" python3 -c '
+import glob, json, os
+
+for path in sorted(glob.glob(os.path.join(os.environ["MCP_CONFIGS_DIR"], "*.json"))):
+    with open(path) as f:
+        servers = json.load(f).get("mcpServers", {})
+    for name, entry in servers.items():
+        if entry.get("command") == "npx":
+            package = [a for a in entry.get("args", []) if not a.startswith("-")][0]
+            print(name, package)
+'
+}
+
+package_for() {
+  known_servers | awk -v s="$1" '$1 == s { print $2 }'
+}
+
+# Locked version for a server, empty if not locked yet
+locked_version() {
+  [ -f "$LOCK_FILE" ] || return 0
+  MCP_LOCK="$LOCK_FILE" MCP_SERVER="$1" python3 -c '
+import json, os
+
+with open(os.environ["MCP_LOCK"]) as f:
+    print(json.load(f).get("servers", {}).get(os.environ["MCP_SERVER"], {}).get("version", ""))
+'
+}
+
+# Record installed version, integrity and entry point of each server in the
+# lockfile, plus npm's package.json and package-lock.json so the full tree
+# (transitive dependencies included) can be restored with `npm ci`
+write_lock() {
+  MCP_PREFIX="$PREFIX" MCP_LOCK="$LOCK_FILE" MCP_NODE="$(command -v node)" python3 -c '
+import json, os, sys
+
+prefix = os.environ["MCP_PREFIX"]
+lock_path = os.environ["MCP_LOCK"]
+lock = {"version": 1, "servers": {}}
+if os.path.exists(lock_path):
+    with open(lock_path) as f:
+        lock = json.load(f)
+with open(os.path.join(prefix, "package.json")) as f:
+    lock["package_json"] = json.load(f)
+with open(os.path.join(prefix, "package-lock.json")) as f:
+    lock["package_lock"] = json.load(f)
+lock["version"] = 2
+npm_lock = lock["package_lock"].get("packages", {})
+
+for line in sys.stdin:
+    server, package = line.split()
+    pkg_dir = os.path.join(prefix, "node_modules", package)
+    with open(os.path.join(pkg_dir, "package.json")) as f:
+        meta = json.load(f)
+    bin_field = meta.get("bin") or meta.get("main") or "index.js"
+    if isinstance(bin_field, dict):
+        short = package.split("/")[-1]
+        bin_field = bin_field.get(short) or next(iter(bin_field.values()))
+    lock["servers"][server] = {
+        "package": package,
+        "version": meta["version"],
+        "integrity": npm_lock.get("node_modules/" + package, {}).get("integrity", ""),
+        "command": os.environ["MCP_NODE"],
+        "entry": os.path.normpath(os.path.join(pkg_dir, bin_field)),
+    }
+
+with open(lock_path, "w") as f:
+    json.dump(lock, f, indent=2, sort_keys=True)
+'
+}
+
+# Write the package.json and package-lock.json recorded in the lockfile into
+# the prefix. Fails if there is no recorded tree or it lacks one of the servers.
+restore_npm_lock() {
+  [ -f "$LOCK_FILE" ] || return 1
+  MCP_PREFIX="$PREFIX" MCP_LOCK="$LOCK_FILE" python3 -c '
+import json, os, sys
+
+prefix = os.environ["MCP_PREFIX"]
+with open(os.environ["MCP_LOCK"]) as f:
+    lock = json.load(f)
+if "package_lock" not in lock or any(s not in lock.get("servers", {}) for s in sys.argv[1:]):
+    sys.exit(1)
+for name, key in (("package.json", "package_json"), ("package-lock.json", "package_lock")):
+    with open(os.path.join(prefix, name), "w") as f:
+        json.dump(lock[key], f, indent=2)
+' "$@"
+}
+
+# npm install the given servers at the given version ("locked" or "latest")
+install_servers() {
+  local mode="$1" server package version specs="" pairs=""
+  shift
+  for server in "$@"; do
+    package="$(package_for "$server")"
+    if [ -z "$package" ]; then
+      echo -e "${RED}Unknown MCP server: $server${RESET}" >&2; exit 1
+    fi
+    version=""
+    [ "$mode" = "locked" ] && version="$(locked_version "$server")"
+    specs="$specs $package@${version:-latest}"
+    pairs="$pairs$server $package"$'\n'
+  done
+
+  mkdir -p "$PREFIX"
+  [ -f "$PREFIX/package.json" ] || echo '{"private": true}' > "$PREFIX/package.json"
+  echo -e "${CYAN}Installing into $PREFIX:${specs}${RESET}"
+  # shellcheck disable=SC2086
+  if [ "$mode" = "locked" ] && restore_npm_lock "$@"; then
+    # Every requested server is locked: reinstall the exact recorded tree
+    npm ci --prefix "$PREFIX" --no-audit --no-fund --loglevel=error
+  else
+    npm install --prefix "$PREFIX" --save-exact --no-audit --no-fund --loglevel=error $specs
+  fi
+  printf '%s' "$pairs" | write_lock
+}
+
+servers_or_all() {
+  if [ $# -gt 0 ]; then printf '%s\n' "$@"; else known_servers | awk '{ print $1 }'; fi
+}
+
+# Print the launch spec for a pinned server: "json" or "lines" (command, entry)
+launch_spec() {
+  [ -f "$LOCK_FILE" ] || { echo -e "${RED}No lockfile at $LOCK_FILE. Run: $0 install${RESET}" >&2; exit 1; }
+  MCP_LOCK="$LOCK_FILE" MCP_SERVER="$1" MCP_FORMAT="${2:-json}" python3 -c '
+import json, os, sys
+
+with open(os.environ["MCP_LOCK"]) as f:
+    entry = json.load(f).get("servers", {}).get(os.environ["MCP_SERVER"])
+if not entry:
+    sys.exit("not pinned: " + os.environ["MCP_SERVER"])
+if os.environ["MCP_FORMAT"] == "lines":
+    print(entry["command"])
+    print(entry["entry"])
+else:
+    print(json.dumps({"command": entry["command"], "args": [entry["entry"]]}))
+'
+}
+
+# Rewrite (or create) the server entry in the Claude config to exec the pinned
+# entry point. Arguments after the package name (e.g. a DSN) and env are kept.
+# An optional second argument targets another file, e.g. the supervisor config.
+register_server() {
+  local config="${2:-$CLAUDE_CONFIG}" key="mcpServers"
+  [ "$config" = "$SUPERVISOR_CONFIG" ] && key="servers"
+  mkdir -p "$(dirname "$config")"
+  [ -f "$config" ] || echo "{\"$key\":{}}" > "$config"
+
+  CLAUDE_CONFIG_PATH="$config" MCP_KEY="$key" MCP_LOCK="$LOCK_FILE" MCP_SERVER="$1" python3 -c '
+import json, os
+
+config_path = os.environ["CLAUDE_CONFIG_PATH"]
+server = os.environ["MCP_SERVER"]
+
+with open(os.environ["MCP_LOCK"]) as f:
+    pin = json.load(f)["servers"][server]
+with open(config_path) as f:
+    config = json.load(f)
+
+entry = config.setdefault(os.environ["MCP_KEY"], {}).setdefault(server, {})
+args = entry.get("args", [])
+wrapper = []
+if args[1:3] == ["launch", "--"]:
+    # Launch wrapper (e.g. pg-pool.py launch -- <server>): keep it, re-pin what it runs.
+    wrapper, args = args[:3], args[4:]
+rest = []
+for i, arg in enumerate(args):
+    if arg == pin["package"] or arg.startswith(pin["package"] + "@"):
+        rest = args[i + 1:]
+        break
+    if arg == pin["entry"]:
+        rest = args[i + 1:]
+        break
+if wrapper:
+    entry["args"] = wrapper + [pin["command"], pin["entry"]] + rest
+else:
+    entry["command"] = pin["command"]
+    entry["args"] = [pin["entry"]] + rest
+
+with open(config_path, "w") as f:
+    json.dump(config, f, indent=2)
+'
+  chmod 600 "$config"
+}
+
+# Re-register servers whose entry (in the Claude or supervisor config)
+# already points at a pinned install
+reregister_pinned() {
+  local server config
+  for config in "$CLAUDE_CONFIG" "$SUPERVISOR_CONFIG"; do
+    [ -f "$config" ] || continue
+    for server in "$@"; do
+      if CLAUDE_CONFIG_PATH="$config" MCP_MODULES="$PREFIX/node_modules" MCP_SERVER="$server" python3 -c '
+import json, os, sys
+
+with open(os.environ["CLAUDE_CONFIG_PATH"]) as f:
+    config = json.load(f)
+entry = config.get("mcpServers", config.get("servers", {})).get(os.environ["MCP_SERVER"], {})
+args = entry.get("args") or []
+sys.exit(0 if any(a.startswith(os.environ["MCP_MODULES"] + os.sep) for a in args) else 1)
+'; then
+        register_server "$server" "$config"
+        echo -e "${GREEN}✓ $server updated in $config${RESET}"
+      fi
+    done
+  done
+}
+
+verify() {
+  [ -f "$LOCK_FILE" ] || { echo -e "${RED}No lockfile at $LOCK_FILE${RESET}"; exit 1; }
+  MCP_PREFIX="$PREFIX" MCP_LOCK="$LOCK_FILE" CLAUDE_CONFIG_PATH="$CLAUDE_CONFIG" \
+    MCP_SUPERVISOR_CONFIG="$SUPERVISOR_CONFIG" python3 -c '
+import json, os, sys
+
+prefix = os.environ["MCP_PREFIX"]
+with open(os.environ["MCP_LOCK"]) as f:
+    lock = json.load(f)
+servers = lock.get("servers", {})
+locked_tree = lock.get("package_lock", {}).get("packages", {})
+# npm records what it actually installed in node_modules/.package-lock.json
+installed_tree = {}
+for name in ("node_modules/.package-lock.json", "package-lock.json"):
+    path = os.path.join(prefix, name)
+    if os.path.exists(path):
+        with open(path) as f:
+            installed_tree = json.load(f).get("packages", {})
+        break
+config = {}
+for path, key in ((os.environ["CLAUDE_CONFIG_PATH"], "mcpServers"),
+                  (os.environ["MCP_SUPERVISOR_CONFIG"], "servers")):
+    if os.path.exists(path):
+        with open(path) as f:
+            config.update(json.load(f).get(key, {}))
+
+failed = False
+for server, pin in sorted(servers.items()):
+    problems = []
+    try:
+        with open(os.path.join(prefix, "node_modules", pin["package"], "package.json")) as f:
+            installed = json.load(f)["version"]
+        if installed != pin["version"]:
+            problems.append("installed %s, locked %s" % (installed, pin["version"]))
+    except FileNotFoundError:
+        problems.append("not installed")
+    integrity = installed_tree.get("node_modules/" + pin["package"], {}).get("integrity", "")
+    if pin.get("integrity") and integrity != pin["integrity"]:
+        problems.append("integrity %s, locked %s" % (integrity or "unknown", pin["integrity"]))
+    if not os.path.isfile(pin["entry"]):
+        problems.append("missing entry point " + pin["entry"])
+    if not os.access(pin["command"], os.X_OK):
+        problems.append("node not found at " + pin["command"])
+    entry = config.get(server)
+    modules = os.path.join(prefix, "node_modules") + os.sep
+    pinned = [a for a in (entry or {}).get("args", []) if a.startswith(modules)]
+    if pinned and pinned[0] != pin["entry"]:
+        problems.append("config points at " + pinned[0])
+    if problems:
+        failed = True
+        print("\033[0;31m✗ %s %s: %s\033[0m" % (server, pin["version"], "; ".join(problems)))
+    else:
+        print("\033[0;32m✓ %s %s\033[0m" % (server, pin["version"]))
+
+# Transitive dependencies: every package in the recorded tree at its locked version and integrity
+checked = {"node_modules/" + pin["package"] for pin in servers.values()}
+drift = []
+for path, meta in sorted(locked_tree.items()):
+    if not path or path in checked or meta.get("link"):
+        continue
+    try:
+        with open(os.path.join(prefix, path, "package.json")) as f:
+            installed = json.load(f).get("version")
+    except FileNotFoundError:
+        installed = None
+    if installed != meta.get("version"):
+        drift.append("%s %s (locked %s)" % (path[len("node_modules/"):], installed or "missing", meta.get("version")))
+    elif meta.get("integrity") and installed_tree.get(path, {}).get("integrity") != meta["integrity"]:
+        drift.append("%s integrity differs from the lock" % path[len("node_modules/"):])
+if drift:
+    failed = True
+    print("\033[0;31m✗ %d dependencies differ from the lock:\033[0m" % len(drift))
+    for line in drift[:20]:
+        print("    " + line)
+elif locked_tree:
+    print("\033[0;32m✓ %d dependencies match the lock\033[0m" % len(set(locked_tree) - checked - {""}))
+sys.exit(1 if failed else 0)
+'
+}
+
+case "$CMD" in
+  install)
+    # shellcheck disable=SC2046
+    install_servers locked $(servers_or_all "$@")
+    echo -e "${GREEN}Done! Lockfile: $LOCK_FILE${RESET}"
+    ;;
+  upgrade)
+    # shellcheck disable=SC2046
+    set -- $(servers_or_all "$@")
+    install_servers latest "$@"
+    reregister_pinned "$@"
+    echo -e "${GREEN}Done! Lockfile: $LOCK_FILE${RESET}"
+    ;;
+  verify)
+    verify
+    ;;
+  register)
+    [ -n "${1:-}" ] || { echo "Usage: $0 register <server>"; exit 1; }
+    [ -n "$(locked_version "$1")" ] || install_servers locked "$1"
+    register_server "$1"
+    echo -e "${GREEN}✓ $1 now launches $(launch_spec "$1")${RESET}"
+    ;;
+  launch)
+    [ -n "${1:-}" ] || { echo "Usage: $0 launch <server>"; exit 1; }
+    launch_spec "$1"
+    ;;
+  exec)
+    [ -n "${1:-}" ] || { echo "Usage: $0 exec <server> [args ...]"; exit 1; }
+    SPEC="$(launch_spec "$1" lines)"
+    shift
+    exec "${SPEC%%$'\n'*}" "${SPEC#*$'\n'}" "$@"
+    ;;
+  *)
+    sed -n '2,22p' "$0" | sed 's/^# \{0,1\}//'
+    [ -z "$CMD" ] || exit 1
+    ;;
+esac
@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+# ============================================================
+#   Claude OS — Shared MCP server supervisor
+#   One local daemon keeps warm instances of each MCP server and
+#   multiplexes every Claude session's stdio JSON-RPC onto them,
+#   instead of each session spawning its own copies.
+#
+#   Usage:
+#     mcp-supervisor.py register <server> [--pool N] [--idle SECONDS]
+#     mcp-supervisor.py unregister <server>
+#     mcp-supervisor.py connect <server>     (the mcpServers command)
+#     mcp-supervisor.py serve                (started on demand by connect)
+#     mcp-supervisor.py status | stop
+#
+#   State lives in $CLAUDE_CONFIG_DIR/mcp/: supervisor.json (real
+#   launch specs), supervisor.sock, supervisor.log, logs/<server>.log
+# ============================================================
+"""Shared MCP server supervisor.
+
+``register`` moves a server's launch spec out of the Claude config into
+``supervisor.json`` and replaces the ``mcpServers`` entry with
+``python3 mcp-supervisor.py connect <server>``. ``connect`` is a thin
+stdio <-> Unix socket bridge that starts the daemon if needed.
+
+The daemon keeps a bounded pool of real server processes per name. It
+performs the ``initialize`` handshake once per process and answers later
+client handshakes from the cached result. Request ids are rewritten so that
+any number of clients can share one process, and progress tokens are
+prefixed with the client's id so clients cannot see each other's progress.
+Idle processes are evicted and respawned on the next request. If a process
+crashes, its in-flight requests fail with a JSON-RPC error and the next
+request starts a fresh one. When ``supervisor.json`` changes (``register``
+again with new options or a new launch spec), new clients get processes
+started from the new spec.
+"""
+
+import argparse
+import fcntl
+import itertools
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+CLAUDE_DIR = os.environ.get("CLAUDE_CONFIG_DIR") or os.path.expanduser("~/.claude")
+STATE_DIR = os.path.join(CLAUDE_DIR, "mcp")
+CONFIG_PATH = os.path.join(STATE_DIR, "supervisor.json")
+SOCKET_PATH = os.path.join(STATE_DIR, "supervisor.sock")
+LOCK_PATH = os.path.join(STATE_DIR, "supervisor.lock")
+LOG_PATH = os.path.join(STATE_DIR, "supervisor.log")
+INSTALLED_PATH = os.path.join(STATE_DIR, "mcp-supervisor.py")
+
+DEFAULT_POOL = 1
+DEFAULT_IDLE = 600
+INIT_TIMEOUT = 60
+LINGER = 1800  # daemon exits after this long with no clients and no servers
+
+INTERNAL_ERROR = -32603
+
+
+def claude_desktop_config():
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Claude/claude_desktop_config.json")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "claude", "claude_desktop_config.json")
+
+
+def load_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def save_json(path, data, mode=0o600):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+
+
+def log(msg):
+    sys.stderr.write(time.strftime("%Y-%m-%d %H:%M:%S ") + msg + "\n")
+    sys.stderr.flush()
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+
+def error_response(msg_id, message):
+    return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": INTERNAL_ERROR, "message": message}}
+
+
+# ------------------------------------------------------------
+#   Daemon
+# ------------------------------------------------------------
+
+class Client:
+    """One connected Claude session."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, conn, pool):
+        self.id = next(self._ids)
+        self.conn = conn
+        self.pool = pool
+        self.instance = None
+        self.init_params = {}
+        self.write_lock = threading.Lock()
+
+    def send(self, msg):
+        try:
+            with self.write_lock:
+                self.conn.sendall(encode(msg))
+        except OSError:
+            pass
+
+
+class Instance:
+    """One real MCP server process shared by many clients."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.proc = None
+        self.init_result = None
+        self.pending = {}          # upstream id -> (client, client id, started, progress token)
+        self.server_requests = {}  # proxy id -> upstream id, for server -> client requests
+        self.progress = {}         # rewritten progress token -> (client, client's token)
+        self.ids = itertools.count(1)
+        self.write_lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.ready = threading.Event()
+        self.alive = False
+
+    # --- lifecycle ---
+
+    def start(self, init_params):
+        spec = self.pool.spec
+        env = dict(os.environ, **spec.get("env", {}))
+        os.makedirs(os.path.join(STATE_DIR, "logs"), exist_ok=True)
+        stderr = open(os.path.join(STATE_DIR, "logs", self.pool.name + ".log"), "ab")
+        self.proc = subprocess.Popen(
+            [spec["command"]] + spec.get("args", []),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr, env=env)
+        stderr.close()
+        self.alive = True
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+        init_id = "supervisor-init"
+        result = {}
+
+        def on_init(msg):
+            result.update(msg)
+            self.ready.set()
+
+        with self.pool.lock:
+            self.pending[init_id] = (on_init, None, time.monotonic(), None)
+        self._write({"jsonrpc": "2.0", "id": init_id, "method": "initialize", "params": init_params})
+        if not self.ready.wait(INIT_TIMEOUT) or "result" not in result:
+            self.stop()
+            raise RuntimeError("initialize failed: %s" % result.get("error", "timeout"))
+        self.init_result = result["result"]
+        self._write({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        log("%s: started pid %d" % (self.pool.name, self.proc.pid))
+
+    def stop(self):
+        self.alive = False
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    # --- traffic ---
+
+    def _write(self, msg):
+        with self.write_lock:
+            self.proc.stdin.write(encode(msg))
+            self.proc.stdin.flush()
+
+    def forward(self, client, msg):
+        """Send a client message upstream, rewriting ids as needed."""
+        pool = self.pool
+        with pool.lock:
+            self.last_used = time.monotonic()
+            if "method" in msg and "id" in msg:
+                upstream_id = next(self.ids)
+                params = msg.get("params") or {}
+                meta = params.get("_meta") or {}
+                token = meta.get("progressToken")
+                if token is not None:
+                    # Clients pick tokens independently; namespace them per client
+                    token = "c%d-%s" % (client.id, meta["progressToken"])
+                    self.progress[token] = (client, meta["progressToken"])
+                    msg = dict(msg, params=dict(params, _meta=dict(meta, progressToken=token)))
+                self.pending[upstream_id] = (client, msg["id"], time.monotonic(), token)
+                pool.metrics["requests"] += 1
+                msg = dict(msg, id=upstream_id)
+            elif "method" in msg:
+                if msg["method"] == "notifications/cancelled":
+                    params = msg.get("params") or {}
+                    for uid, (c, cid, _, _) in self.pending.items():
+                        if c is client and cid == params.get("requestId"):
+                            msg = dict(msg, params=dict(params, requestId=uid))
+                            break
+            else:
+                upstream_id = self.server_requests.pop(msg.get("id"), None)
+                if upstream_id is None:
+                    return
+                msg = dict(msg, id=upstream_id)
+        try:
+            self._write(msg)
+        except (OSError, ValueError):
+            self._on_exit()
+
+    def _read_loop(self):
+        for line in self.proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            self._dispatch(msg)
+        self._on_exit()
+
+    def _dispatch(self, msg):
+        pool = self.pool
+        with pool.lock:
+            self.last_used = time.monotonic()
+            if "method" not in msg:
+                entry = self.pending.pop(msg.get("id"), None)
+                if entry is None:
+                    return
+                client, client_id, started, token = entry
+                self.progress.pop(token, None)
+                if callable(client):
+                    client(msg)
+                    return
+                elapsed = (time.monotonic() - started) * 1000
+                pool.metrics["latency_ms_total"] += elapsed
+                pool.metrics["latency_ms_max"] = max(pool.metrics["latency_ms_max"], elapsed)
+                if "error" in msg:
+                    pool.metrics["errors"] += 1
+                targets, msg = [client], dict(msg, id=client_id)
+            elif "id" in msg:
+                # Server -> client request: route to the most recently attached client.
+                clients = [c for c in pool.clients if c.instance is self]
+                if not clients:
+                    return
+                proxy_id = "s%d-%s" % (next(self.ids), msg["id"])
+                self.server_requests[proxy_id] = msg["id"]
+                targets, msg = [clients[-1]], dict(msg, id=proxy_id)
+            elif msg["method"] == "notifications/progress":
+                params = msg.get("params") or {}
+                client, token = self.progress.get(params.get("progressToken"), (None, None))
+                targets = [client] if client else []
+                msg = dict(msg, params=dict(params, progressToken=token))
+            else:
+                targets = [c for c in pool.clients if c.instance is self]
+        for client in targets:
+            client.send(msg)
+
+    def _on_exit(self):
+        with self.pool.lock:
+            if not self.alive:
+                return
+            self.alive = False
+            failed, self.pending = self.pending, {}
+            if self in self.pool.instances:
+                self.pool.instances.remove(self)
+                self.pool.metrics["crashes"] += 1
+                try:
+                    code = self.proc.wait(1)
+                except subprocess.TimeoutExpired:
+                    code = None
+                log("%s: process exited (code %s)" % (self.pool.name, code))
+            for client in self.pool.clients:
+                if client.instance is self:
+                    client.instance = None
+        for client, client_id, _, _ in failed.values():
+            if callable(client):
+                # Still starting: fail start() now rather than after INIT_TIMEOUT
+                client({"error": "server exited before answering"})
+            else:
+                client.send(error_response(client_id, "MCP server '%s' exited" % self.pool.name))
+
+
+class Pool:
+    """Warm instances of one configured server."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        self.size = max(1, int(spec.get("pool", DEFAULT_POOL)))
+        self.idle = float(spec.get("idle_timeout", DEFAULT_IDLE))
+        self.instances = []
+        self.clients = []
+        self.lock = threading.RLock()
+        self.spawn_lock = threading.Lock()
+        self.metrics = dict(requests=0, errors=0, latency_ms_total=0.0, latency_ms_max=0.0,
+                            spawns=0, crashes=0, evictions=0)
+
+    def instance_for(self, client, init_params):
+        """Sticky instance for a client: least loaded, spawning up to the pool size."""
+        with self.lock:
+            if client.instance and client.instance.alive:
+                return client.instance
+        with self.spawn_lock:
+            with self.lock:
+                live = [i for i in self.instances if i.alive]
+                best = min(live, key=lambda i: len(i.pending), default=None)
+                if best and (len(best.pending) == 0 or len(live) >= self.size):
+                    client.instance = best
+                    return best
+            inst = Instance(self)
+            inst.start(init_params)
+            with self.lock:
+                self.instances.append(inst)
+                self.metrics["spawns"] += 1
+                client.instance = inst
+            return inst
+
+    def evict_idle(self, now):
+        with self.lock:
+            idle = [i for i in self.instances
+                    if not i.pending and now - i.last_used > self.idle]
+            for inst in idle:
+                self.instances.remove(inst)
+                self.metrics["evictions"] += 1
+                for client in self.clients:
+                    if client.instance is inst:
+                        client.instance = None
+        for inst in idle:
+            log("%s: evicting idle pid %d" % (self.name, inst.proc.pid))
+            inst.stop()
+
+    def status(self):
+        with self.lock:
+            m = dict(self.metrics)
+            answered = m["requests"] - sum(len(i.pending) for i in self.instances)
+            m["latency_ms_avg"] = round(m["latency_ms_total"] / answered, 2) if answered else 0.0
+            m["latency_ms_total"] = round(m["latency_ms_total"], 2)
+            m["latency_ms_max"] = round(m["latency_ms_max"], 2)
+            m["in_flight"] = sum(len(i.pending) for i in self.instances)
+            m["instances"] = [i.proc.pid for i in self.instances]
+            m["clients"] = len(self.clients)
+            m["pool"] = self.size
+            return m
+
+
+class Supervisor:
+    def __init__(self, linger=LINGER):
+        self.pools = {}
+        self.retired = []      # pools whose spec changed, kept until their clients leave
+        self.specs = {}
+        self.config_stamp = None
+        self.lock = threading.Lock()
+        self.linger = linger
+        self.last_active = time.monotonic()
+        self.stopping = threading.Event()
+
+    def pool(self, name):
+        with self.lock:
+            self._reload()
+            if name not in self.pools:
+                spec = self.specs.get(name)
+                if spec is None:
+                    return None
+                self.pools[name] = Pool(name, spec)
+            return self.pools[name]
+
+    def _reload(self):
+        """Re-read supervisor.json if it changed; retire pools whose spec changed.
+
+        Clients already attached to a retired pool keep their process until
+        they disconnect. New clients get a pool with the new spec.
+        """
+        try:
+            st = os.stat(CONFIG_PATH)
+            stamp = (st.st_mtime_ns, st.st_ino, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self.config_stamp:
+            return
+        self.config_stamp = stamp
+        self.specs = load_json(CONFIG_PATH, {}).get("servers", {})
+        for name, pool in list(self.pools.items()):
+            if self.specs.get(name) != pool.spec:
+                log("%s: launch spec changed, new clients get a fresh process" % name)
+                del self.pools[name]
+                self.retired.append(pool)
+
+    def handle(self, conn):
+        reader = conn.makefile("rb")
+        first = json.loads(reader.readline() or b"{}")
+        if first.get("control") == "status":
+            conn.sendall(encode({name: p.status() for name, p in self.pools.items()}))
+            return
+        if first.get("control") == "stop":
+            conn.sendall(encode({"stopping": True}))
+            self.stopping.set()
+            return
+        pool = self.pool(first.get("attach", ""))
+        if pool is None:
+            conn.sendall(encode({"error": "server not registered: %s" % first.get("attach")}))
+            return
+        conn.sendall(encode({"attached": pool.name}))
+        client = Client(conn, pool)
+        with pool.lock:
+            pool.clients.append(client)
+        try:
+            for line in reader:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                for item in msg if isinstance(msg, list) else [msg]:
+                    self.route(client, item)
+        finally:
+            with pool.lock:
+                pool.clients.remove(client)
+                self.last_active = time.monotonic()
+
+    def route(self, client, msg):
+        pool = client.pool
+        method = msg.get("method")
+        if method == "notifications/initialized":
+            return
+        if method == "initialize":
+            client.init_params = msg.get("params") or {}
+        try:
+            inst = pool.instance_for(client, client.init_params)
+        except (OSError, RuntimeError) as e:
+            log("%s: %s" % (pool.name, e))
+            if "id" in msg and method:
+                client.send(error_response(msg["id"], "MCP server '%s' failed to start: %s" % (pool.name, e)))
+            return
+        if method == "initialize":
+            client.send({"jsonrpc": "2.0", "id": msg["id"], "result": inst.init_result})
+            return
+        inst.forward(client, msg)
+
+    def reaper(self):
+        while not self.stopping.wait(5):
+            now = time.monotonic()
+            with self.lock:
+                self._reload()
+                pools = list(self.pools.values())
+                retired = self.retired
+            for pool in pools:
+                pool.evict_idle(now)
+            for pool in retired:
+                # Nobody can attach to a retired pool; stop it once its clients are gone
+                pool.evict_idle(now if pool.clients else float("inf"))
+            with self.lock:
+                self.retired = [p for p in self.retired if p.clients or p.instances]
+            busy = any(p.clients or p.instances for p in pools + retired)
+            if busy:
+                self.last_active = now
+            elif now - self.last_active > self.linger:
+                log("no clients for %ds, exiting" % self.linger)
+                self.stopping.set()
+
+    def serve(self):
+        lock = open(LOCK_PATH, "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0  # another daemon owns the socket
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(SOCKET_PATH)
+        os.chmod(SOCKET_PATH, 0o600)
+        server.listen(64)
+        server.settimeout(1)
+        log("supervisor listening on %s (pid %d)" % (SOCKET_PATH, os.getpid()))
+        threading.Thread(target=self.reaper, daemon=True).start()
+        try:
+            while not self.stopping.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            os.unlink(SOCKET_PATH)
+            for pool in list(self.pools.values()) + self.retired:
+                for inst in list(pool.instances):
+                    inst.stop()
+            log("supervisor stopped")
+        return 0
+
+    def _serve_conn(self, conn):
+        try:
+            self.handle(conn)
+        except (OSError, ValueError) as e:
+            log("connection error: %s" % e)
+        finally:
+            conn.close()
+
+
+# ------------------------------------------------------------
+#   Client side
+# ------------------------------------------------------------
+
+def open_socket(autostart=True, timeout=10):
+    deadline = time.monotonic() + timeout
+    started = False
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(SOCKET_PATH)
+            return sock
+        except OSError:
+            sock.close()
+            if not autostart:
+                return None
+        if not started:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(LOG_PATH, "ab") as logf:
+                subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve"],
+                                 stdin=subprocess.DEVNULL, stdout=logf, stderr=logf,
+                                 start_new_session=True)
+            started = True
+        if time.monotonic() > deadline:
+            raise SystemExit("mcp-supervisor: daemon did not start, see " + LOG_PATH)
+        time.sleep(0.05)
+
+
+def control(command):
+    sock = open_socket(autostart=False)
+    if sock is None:
+        return None
+    with sock:
+        sock.sendall(encode({"control": command}))
+        return json.loads(sock.makefile("rb").readline() or b"null")
+
+
+def connect(name):
+    """Bridge this process's stdio to the daemon."""
+    sock = open_socket()
+    sock.sendall(encode({"attach": name}))
+    reader = sock.makefile("rb")
+    reply = json.loads(reader.readline() or b"{}")
+    if "error" in reply:
+        sys.stderr.write("mcp-supervisor: %s\n" % reply["error"])
+        return 1
+
+    def upstream():
+        for line in sys.stdin.buffer:
+            sock.sendall(line)
+        sock.shutdown(socket.SHUT_WR)
+
+    threading.Thread(target=upstream, daemon=True).start()
+    out = sys.stdout.buffer
+    for line in reader:
+        out.write(line)
+        out.flush()
+    return 0
+
+
+def register(name, pool, idle):
+    """Move a server's launch spec behind the supervisor."""
+    desktop_path = claude_desktop_config()
+    desktop = load_json(desktop_path, {"mcpServers": {}})
+    entry = desktop.get("mcpServers", {}).get(name)
+    config = load_json(CONFIG_PATH, {"servers": {}})
+    if entry is None:
+        raise SystemExit("No mcpServers entry named '%s' in %s" % (name, desktop_path))
+    if (entry.get("args") or [None])[0] != INSTALLED_PATH:
+        config["servers"][name] = {k: entry[k] for k in ("command", "args", "env") if k in entry}
+    spec = config["servers"].get(name)
+    if spec is None:
+        raise SystemExit("No supervisor spec for '%s'" % name)
+    spec["pool"] = pool
+    spec["idle_timeout"] = idle
+    save_json(CONFIG_PATH, config)
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    if os.path.abspath(__file__) != INSTALLED_PATH:
+        shutil.copy2(os.path.abspath(__file__), INSTALLED_PATH)
+    desktop["mcpServers"][name] = {"command": sys.executable, "args": [INSTALLED_PATH, "connect", name]}
+    save_json(desktop_path, desktop)
+    print("%s now runs behind the supervisor (pool %d, idle %ds)" % (name, pool, idle))
+
+
+def unregister(name):
+    desktop_path = claude_desktop_config()
+    desktop = load_json(desktop_path, {"mcpServers": {}})
+    config = load_json(CONFIG_PATH, {"servers": {}})
+    spec = config["servers"].pop(name, None)
+    if spec is None:
+        raise SystemExit("'%s' is not registered with the supervisor" % name)
+    desktop.setdefault("mcpServers", {})[name] = {
+        k: spec[k] for k in ("command", "args", "env") if k in spec}
+    save_json(desktop_path, desktop)
+    save_json(CONFIG_PATH, config)
+    print("%s restored to a direct launch" % name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_reg = sub.add_parser("register", help="route a configured server through the supervisor")
+    p_reg.add_argument("server")
+    p_reg.add_argument("--pool", type=int, default=DEFAULT_POOL, help="max warm processes")
+    p_reg.add_argument("--idle", type=int, default=DEFAULT_IDLE, help="seconds before an idle process is stopped")
+    p_unreg = sub.add_parser("unregister", help="restore the server's direct launch")
+    p_unreg.add_argument("server")
+    p_conn = sub.add_parser("connect", help="stdio bridge used as the mcpServers command")
+    p_conn.add_argument("server")
+    p_serve = sub.add_parser("serve", help="run the daemon in the foreground")
+    p_serve.add_argument("--linger", type=int, default=LINGER)
+    sub.add_parser("status", help="print per-server metrics as JSON")
+    sub.add_parser("stop", help="stop the daemon and its servers")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "register":
+        register(args.server, args.pool, args.idle)
+    elif args.cmd == "unregister":
+        unregister(args.server)
+    elif args.cmd == "connect":
+        return connect(args.server)
+    elif args.cmd == "serve":
+        os.makedirs(STATE_DIR, exist_ok=True)
+        return Supervisor(args.linger).serve()
+    else:
+        reply = control(args.cmd)
+        if reply is None:
+            print("supervisor not running")
+            return 1
+        print(json.dumps(reply, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
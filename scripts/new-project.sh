@@ -1,8 +1,23 @@
 #!/usr/bin/env bash
 # ============================================================
 #   Claude OS — New Project Bootstrap
-#   Usage: ./scripts/new-project.sh <template> <project-name>
+#   Usage: ./scripts/new-project.sh [options] <template> <project-name>
 #   Example: ./scripts/new-project.sh nextjs-fullstack my-app
+#
+#   Options:
+#     --claude-os    Also give the project its own .claude/agents,
+#                    commands and skills (from ~/.claude)
+#     --link MODE    auto (default: reflink, else a plain copy that
+#                    bypasses the store), reflink, copy,
+#                    or hard/symlink (shared with other projects, see
+#                    scripts/cas-store.py)
+#     --copy         Plain copy, no shared store (same as --link copy)
+#     --gc           Delete store blobs no project uses any more
+#
+#   Where the filesystem supports copy-on-write clones, files come
+#   from a shared content-addressed store (scripts/cas-store.py),
+#   so new projects cost almost no disk. Elsewhere they are plain
+#   copies unless --link hard/symlink is given.
 # ============================================================
 
 set -euo pipefail
@@ -12,21 +27,52 @@ CYAN='\033[0;36m'; GREEN='\033[0;32m'; RED='\033[0;31m'; BOLD='\033[1m'; RESET='
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 REPO_DIR="$(dirname "$SCRIPT_DIR")"
 TEMPLATES_DIR="$REPO_DIR/templates"
+CLAUDE_DIR="${CLAUDE_CONFIG_DIR:-$HOME/.claude}"
+# Template index, kept outside the checkout so read-only clones work
+CACHE_DIR="${CLAUDE_OS_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/claude-os}"
 
-TEMPLATE="${1:-}"
-PROJECT_NAME="${2:-}"
+LINK_MODE="auto"
+WITH_CLAUDE_OS=0
+ARGS=()
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --claude-os) WITH_CLAUDE_OS=1 ;;
+    --link)
+      case "${2:-}" in
+        auto|reflink|hard|symlink|copy) LINK_MODE="$2"; shift ;;
+        *) echo -e "${RED}--link needs one of: auto, reflink, hard, symlink, copy${RESET}"; exit 1 ;;
+      esac ;;
+    --copy) LINK_MODE="copy" ;;
+    --gc) exec python3 "$SCRIPT_DIR/cas-store.py" gc ;;
+    -*) echo -e "${RED}Unknown option: $1${RESET}"; exit 1 ;;
+    *) ARGS+=("$1") ;;
+  esac
+  shift
+done
+
+TEMPLATE="${ARGS[0]:-}"
+PROJECT_NAME="${ARGS[1]:-}"
 
 # List available templates
 if [ -z "$TEMPLATE" ]; then
   echo -e "${BOLD}Available templates:${RESET}"
-  for dir in "$TEMPLATES_DIR"/*/; do
-    name="$(basename "$dir")"
-    desc=""
-    [ -f "$dir/CLAUDE.md" ] && desc=$(head -3 "$dir/CLAUDE.md" | tail -1)
-    echo -e "  ${CYAN}$name${RESET}  $desc"
-  done
+  if command -v python3 &>/dev/null; then
+    # Names and descriptions come from the template index (rebuilt only for changed files)
+    python3 "$SCRIPT_DIR/build-index.py" list "$TEMPLATES_DIR" --templates --refresh --kind template \
+        --index "$CACHE_DIR/templates-index.json" |
+      while IFS=$'\t' read -r name desc; do
+        echo -e "  ${CYAN}$name${RESET}  $desc"
+      done
+  else
+    for dir in "$TEMPLATES_DIR"/*/; do
+      name="$(basename "$dir")"
+      desc=""
+      [ -f "$dir/CLAUDE.md" ] && desc=$(head -3 "$dir/CLAUDE.md" | tail -1)
+      echo -e "  ${CYAN}$name${RESET}  $desc"
+    done
+  fi
   echo ""
-  echo "Usage: $0 <template> <project-name>"
+  echo "Usage: $0 [--claude-os] [--link MODE | --copy] <template> <project-name>"
   exit 0
 fi
 
@@ -58,11 +104,32 @@ echo ""
 # Create project directory
 mkdir -p "$PROJECT_DIR"
 
-# Copy template contents
-cp -r "$TEMPLATE_DIR/." "$PROJECT_DIR/"
+# Place a directory's files in the project: linked from the shared store,
+# or plain-copied with --copy (or when python3 is unavailable)
+place_tree() {
+  if [ "$LINK_MODE" != "copy" ] && command -v python3 &>/dev/null; then
+    local out
+    out="$(python3 "$SCRIPT_DIR/cas-store.py" link "$1" "$2" --mode "$LINK_MODE" --project "$PROJECT_DIR")"
+    echo -e "  $(basename "$2"): $out"
+  else
+    mkdir -p "$2"
+    cp -r "$1/." "$2/"
+  fi
+}
+
+# Template contents
+place_tree "$TEMPLATE_DIR" "$PROJECT_DIR"
 
-# Copy Claude OS base agents and commands
+# Claude OS base agents and commands
 mkdir -p "$PROJECT_DIR/.claude/agents" "$PROJECT_DIR/.claude/commands"
+if [ "$WITH_CLAUDE_OS" = "1" ]; then
+  for component in agents commands skills; do
+    if [ -d "$CLAUDE_DIR/$component" ]; then
+      place_tree "$CLAUDE_DIR/$component" "$PROJECT_DIR/.claude/$component"
+    fi
+  done
+  echo -e "${GREEN}✓ Claude OS agents, commands and skills linked${RESET}"
+fi
 
 # Rename template CLAUDE.md if exists
 [ -f "$PROJECT_DIR/CLAUDE.md" ] && echo -e "${GREEN}✓ CLAUDE.md configured${RESET}"
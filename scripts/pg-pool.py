@@ -0,0 +1,971 @@
+#!/usr/bin/env python3
+# ============================================================
+#   Claude OS — PostgreSQL connection pool for the MCP server
+#   A local proxy that every postgres MCP process (one per Claude
+#   session or parallel agent) connects to instead of the real
+#   database. It holds a small, bounded pool of real connections
+#   per DSN and lends one out per transaction.
+#
+#   Usage:
+#     pg-pool.py register <server> [--pool-size N] [--statement-timeout MS]
+#                         [--max-rows N] [--wait-timeout S]
+#     pg-pool.py unregister <server>
+#     pg-pool.py launch -- <command> [args]   (the mcpServers command)
+#     pg-pool.py serve                        (started on demand by launch)
+#     pg-pool.py status | stop
+#
+#   State lives in $CLAUDE_CONFIG_DIR/mcp/: pg-pool.json (real
+#   DSNs and pool settings, mode 600), pg-pool.sock, pg-pool.log
+# ============================================================
+"""Transaction-pooling PostgreSQL proxy.
+
+``register`` moves the DSN out of a server's ``mcpServers`` args into
+``pg-pool.json`` and replaces it with a loopback URL
+(``postgresql://claude:<token>@127.0.0.1:<port>/<server>``). The port is
+a free one picked by the first ``register`` and kept in ``pg-pool.json``
+as ``listen``. The entry is
+wrapped in ``pg-pool.py launch --``, which starts the daemon if needed
+and then execs the real server.
+
+The daemon speaks the PostgreSQL wire protocol. Each client gets a
+database connection from its pool when it sends a query and returns it
+at the next ``ReadyForQuery`` that reports an idle (non-transaction)
+state. At most ``pool_size`` connections are open per DSN. Clients beyond
+that wait up to ``wait_timeout`` and then get SQLSTATE 53300.
+Connections are opened with a default ``statement_timeout``. Result sets
+are capped at ``max_rows`` rows and the extra rows are discarded while
+streaming, with a NOTICE to the client.
+
+Like any transaction pooler, session state (``SET``, named prepared
+statements, ``LISTEN``, advisory locks, temporary tables) does not
+survive past the end of a transaction. A connection whose client sent
+anything that looks like it changes that state gets ``DISCARD ALL``
+before it goes back to the pool, so the next client never sees it.
+"""
+
+import argparse
+import base64
+import fcntl
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import re
+import secrets
+import select
+import shutil
+import socket
+import ssl
+import struct
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+CLAUDE_DIR = os.environ.get("CLAUDE_CONFIG_DIR") or os.path.expanduser("~/.claude")
+STATE_DIR = os.path.join(CLAUDE_DIR, "mcp")
+CONFIG_PATH = os.path.join(STATE_DIR, "pg-pool.json")
+SOCKET_PATH = os.path.join(STATE_DIR, "pg-pool.sock")
+LOCK_PATH = os.path.join(STATE_DIR, "pg-pool.lock")
+LOG_PATH = os.path.join(STATE_DIR, "pg-pool.log")
+INSTALLED_PATH = os.path.join(STATE_DIR, "pg-pool.py")
+
+LISTEN_HOST = "127.0.0.1"
+DEFAULT_POOL_SIZE = 5
+DEFAULT_STATEMENT_TIMEOUT = 30000  # ms
+DEFAULT_IDLE_IN_TRANSACTION = 60000  # ms
+DEFAULT_MAX_ROWS = 1000
+DEFAULT_WAIT_TIMEOUT = 30  # s
+SERVER_IDLE = 300  # close pooled connections unused this long
+LINGER = 1800  # daemon exits after this long with no clients
+PROXY_USER = "claude"
+
+SSL_REQUEST = 80877103
+GSSENC_REQUEST = 80877104
+CANCEL_REQUEST = 80877102
+PROTOCOL_3 = 196608
+# Statements that may leave session state behind. False positives (UPDATE ... SET)
+# only cost a DISCARD ALL; SET LOCAL and pg_advisory_xact_lock end with the transaction.
+SESSION_STATE = re.compile(
+    rb"\b(set|reset|set_config|prepare|listen|declare|temp|temporary|pg_(try_)?advisory_lock\w*)\b",
+    re.IGNORECASE)
+
+
+def claude_desktop_config():
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Claude/claude_desktop_config.json")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "claude", "claude_desktop_config.json")
+
+
+def load_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def save_json(path, data, mode=0o600):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+
+
+def log(msg):
+    sys.stderr.write(time.strftime("%Y-%m-%d %H:%M:%S ") + msg + "\n")
+    sys.stderr.flush()
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+
+# ------------------------------------------------------------
+#   Wire protocol
+# ------------------------------------------------------------
+
+class ProtocolError(Exception):
+    pass
+
+
+class DatabaseError(Exception):
+    """An ErrorResponse from the real server, raised while connecting."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        super().__init__("%s: %s" % (fields.get("C", "?"), fields.get("M", "unknown error")))
+
+
+def message(kind, payload=b""):
+    return kind + struct.pack("!I", len(payload) + 4) + payload
+
+
+def cstr(value):
+    return value.encode() + b"\0"
+
+
+def error_message(code, text, severity="ERROR"):
+    fields = b"S" + cstr(severity) + b"V" + cstr(severity) + b"C" + cstr(code) + b"M" + cstr(text)
+    return message(b"E", fields + b"\0")
+
+
+def notice_message(text):
+    return message(b"N", b"SNOTICE\0VNOTICE\0C01000\0M" + cstr(text) + b"\0")
+
+
+def parse_fields(payload):
+    fields = {}
+    for part in payload.split(b"\0"):
+        if part:
+            fields[chr(part[0])] = part[1:].decode("utf-8", "replace")
+    return fields
+
+
+class Stream:
+    """Buffered message reader over a (possibly TLS) socket."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buf = bytearray()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def fill(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise EOFError
+        self.buf += data
+
+    def buffered(self):
+        """True if a whole message can be read without blocking."""
+        if isinstance(self.sock, ssl.SSLSocket) and self.sock.pending():
+            self.fill()
+        if len(self.buf) < 5:
+            return False
+        return len(self.buf) >= 1 + struct.unpack_from("!I", self.buf, 1)[0]
+
+    def read_exact(self, n):
+        while len(self.buf) < n:
+            self.fill()
+        data = bytes(self.buf[:n])
+        del self.buf[:n]
+        return data
+
+    def read_message(self):
+        """Return (kind, payload, raw bytes)."""
+        header = self.read_exact(5)
+        length = struct.unpack("!I", header[1:])[0]
+        payload = self.read_exact(length - 4)
+        return header[:1], payload, header + payload
+
+    def read_startup(self):
+        length = struct.unpack("!I", self.read_exact(4))[0]
+        if not 8 <= length <= 10000:
+            raise ProtocolError("bad startup packet length %d" % length)
+        return self.read_exact(length - 4)
+
+    def send(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def parse_dsn(url):
+    """Connection parameters from a postgres:// URL."""
+    u = urllib.parse.urlsplit(url)
+    if u.scheme not in ("postgres", "postgresql"):
+        raise ValueError("not a postgres URL: " + u.scheme)
+    query = dict(urllib.parse.parse_qsl(u.query))
+    host = query.get("host") or u.hostname or "/var/run/postgresql"
+    return {
+        "host": urllib.parse.unquote(host),
+        "port": int(query.get("port") or u.port or 5432),
+        "user": urllib.parse.unquote(u.username or query.get("user") or os.environ.get("USER", "postgres")),
+        "password": urllib.parse.unquote(u.password or query.get("password") or ""),
+        "database": urllib.parse.unquote(u.path.lstrip("/")) or query.get("dbname") or "",
+        "sslmode": query.get("sslmode", "prefer"),
+    }
+
+
+def open_socket_to(params):
+    if params["host"].startswith("/"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(os.path.join(params["host"], ".s.PGSQL.%d" % params["port"]))
+        return sock
+    sock = socket.create_connection((params["host"], params["port"]), timeout=10)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(None)
+    return sock
+
+
+def negotiate_ssl(sock, params):
+    mode = params["sslmode"]
+    if mode == "disable" or sock.family == socket.AF_UNIX:
+        return sock
+    sock.sendall(struct.pack("!II", 8, SSL_REQUEST))
+    answer = sock.recv(1)
+    if answer != b"S":
+        if mode in ("require", "verify-ca", "verify-full"):
+            raise ProtocolError("server does not support SSL (sslmode=%s)" % mode)
+        return sock
+    ctx = ssl.create_default_context()
+    if mode != "verify-full":
+        ctx.check_hostname = False
+    if mode not in ("verify-ca", "verify-full"):
+        ctx.verify_mode = ssl.CERT_NONE
+    return ctx.wrap_socket(sock, server_hostname=params["host"])
+
+
+def scram_exchange(stream, params, mechanisms):
+    if "SCRAM-SHA-256" not in mechanisms:
+        raise ProtocolError("unsupported SASL mechanisms: %s" % ", ".join(mechanisms))
+    nonce = base64.b64encode(secrets.token_bytes(18)).decode()
+    first_bare = "n=,r=" + nonce
+    initial = ("n,," + first_bare).encode()
+    stream.send(message(b"p", cstr("SCRAM-SHA-256") + struct.pack("!I", len(initial)) + initial))
+
+    kind, payload, _ = stream.read_message()
+    if kind == b"E":
+        raise DatabaseError(parse_fields(payload))
+    server_first = payload[4:].decode()
+    attrs = dict(item.split("=", 1) for item in server_first.split(","))
+    if not attrs["r"].startswith(nonce):
+        raise ProtocolError("SCRAM nonce mismatch")
+    salted = hashlib.pbkdf2_hmac("sha256", params["password"].encode(),
+                                 base64.b64decode(attrs["s"]), int(attrs["i"]))
+    client_key = hmac.new(salted, b"Client Key", "sha256").digest()
+    stored_key = hashlib.sha256(client_key).digest()
+    final_bare = "c=biws,r=" + attrs["r"]
+    auth_message = ",".join((first_bare, server_first, final_bare)).encode()
+    signature = hmac.new(stored_key, auth_message, "sha256").digest()
+    proof = bytes(a ^ b for a, b in zip(client_key, signature))
+    stream.send(message(b"p", (final_bare + ",p=" + base64.b64encode(proof).decode()).encode()))
+
+    kind, payload, _ = stream.read_message()
+    if kind == b"E":
+        raise DatabaseError(parse_fields(payload))
+    server_key = hmac.new(salted, b"Server Key", "sha256").digest()
+    expected = base64.b64encode(hmac.new(server_key, auth_message, "sha256").digest()).decode()
+    if payload[4:].decode() != "v=" + expected:
+        raise ProtocolError("SCRAM server signature mismatch")
+
+
+class Backend:
+    """One real server connection."""
+
+    def __init__(self, params, settings):
+        sock = negotiate_ssl(open_socket_to(params), params)
+        self.stream = Stream(sock)
+        self.params = params
+        self.status = {}
+        self.key = None
+        self.last_used = time.monotonic()
+        self.dirty = False  # session state must be reset before reuse
+        options = "-c statement_timeout=%d -c idle_in_transaction_session_timeout=%d" % (
+            settings["statement_timeout"], settings["idle_in_transaction_timeout"])
+        startup = b"".join(cstr(k) + cstr(v) for k, v in (
+            ("user", params["user"]), ("database", params["database"] or params["user"]),
+            ("application_name", "claude-os-pg-pool"), ("client_encoding", "UTF8"),
+            ("options", options))) + b"\0"
+        body = struct.pack("!I", PROTOCOL_3) + startup
+        self.stream.send(struct.pack("!I", len(body) + 4) + body)
+        try:
+            self._handshake()
+        except BaseException:
+            self.stream.close()
+            raise
+
+    def _handshake(self):
+        while True:
+            kind, payload, _ = self.stream.read_message()
+            if kind == b"E":
+                raise DatabaseError(parse_fields(payload))
+            if kind == b"R":
+                code = struct.unpack_from("!I", payload)[0]
+                if code == 3:
+                    self.stream.send(message(b"p", cstr(self.params["password"])))
+                elif code == 5:
+                    inner = hashlib.md5((self.params["password"] + self.params["user"]).encode()).hexdigest()
+                    outer = hashlib.md5(inner.encode() + payload[4:8]).hexdigest()
+                    self.stream.send(message(b"p", cstr("md5" + outer)))
+                elif code == 10:
+                    mechanisms = [m.decode() for m in payload[4:].split(b"\0") if m]
+                    scram_exchange(self.stream, self.params, mechanisms)
+                elif code not in (0, 12):
+                    raise ProtocolError("unsupported authentication method %d" % code)
+            elif kind == b"S":
+                name, value = payload.split(b"\0")[:2]
+                self.status[name] = value
+            elif kind == b"K":
+                self.key = payload
+            elif kind == b"Z":
+                return
+
+    def note(self, kind, payload):
+        """Mark the connection dirty if a client message may change session state."""
+        if kind == b"Q":
+            self.dirty = self.dirty or bool(SESSION_STATE.search(payload))
+        elif kind == b"P":
+            name, query = payload.split(b"\0")[:2]
+            self.dirty = self.dirty or bool(name) or bool(SESSION_STATE.search(query))
+
+    def reset(self):
+        """Run DISCARD ALL; return whether the connection is clean and idle."""
+        self.stream.send(message(b"Q", cstr("DISCARD ALL")))
+        ok = True
+        while True:
+            kind, payload, _ = self.stream.read_message()
+            if kind == b"E":
+                ok = False
+            elif kind == b"S":
+                name, value = payload.split(b"\0")[:2]
+                self.status[name] = value
+            elif kind == b"Z":
+                self.dirty = False
+                return ok and payload == b"I"
+
+    def alive(self):
+        """An idle connection with anything to read has been closed or errored."""
+        if self.stream.buf:
+            return False
+        readable, _, _ = select.select([self.stream], [], [], 0)
+        return not readable
+
+    def cancel(self):
+        if not self.key:
+            return
+        sock = open_socket_to(self.params)
+        with sock:
+            sock.sendall(struct.pack("!II", 16, CANCEL_REQUEST) + self.key)
+
+    def close(self):
+        try:
+            self.stream.send(message(b"X"))
+        except OSError:
+            pass
+        self.stream.close()
+
+
+# ------------------------------------------------------------
+#   Daemon
+# ------------------------------------------------------------
+
+class PoolTimeout(Exception):
+    pass
+
+
+class Pool:
+    """Bounded set of server connections for one DSN."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.params = parse_dsn(spec["url"])
+        self.size = max(1, int(spec.get("pool_size", DEFAULT_POOL_SIZE)))
+        self.wait_timeout = float(spec.get("wait_timeout", DEFAULT_WAIT_TIMEOUT))
+        self.max_rows = int(spec.get("max_rows", DEFAULT_MAX_ROWS))
+        self.settings = {
+            "statement_timeout": int(spec.get("statement_timeout", DEFAULT_STATEMENT_TIMEOUT)),
+            "idle_in_transaction_timeout": int(spec.get("idle_in_transaction_timeout",
+                                                        DEFAULT_IDLE_IN_TRANSACTION)),
+        }
+        self.idle = []
+        self.in_use = 0
+        self.waiting = 0
+        self.server_status = None
+        self.cond = threading.Condition()
+        self.saturated_since = None
+        self.metrics = dict(clients=0, clients_total=0, transactions=0, waits=0,
+                            wait_ms_total=0.0, wait_ms_max=0.0, timeouts=0, max_waiting=0,
+                            saturated_ms=0.0, connects=0, connect_errors=0, discarded=0,
+                            resets=0, truncated_results=0)
+
+    def _mark_saturation(self):
+        now = time.monotonic()
+        if self.in_use >= self.size and self.saturated_since is None:
+            self.saturated_since = now
+        elif self.in_use < self.size and self.saturated_since is not None:
+            self.metrics["saturated_ms"] += (now - self.saturated_since) * 1000
+            self.saturated_since = None
+
+    def acquire(self):
+        started = time.monotonic()
+        with self.cond:
+            if not self.idle and self.in_use >= self.size:
+                self.waiting += 1
+                self.metrics["waits"] += 1
+                self.metrics["max_waiting"] = max(self.metrics["max_waiting"], self.waiting)
+                try:
+                    deadline = started + self.wait_timeout
+                    while not self.idle and self.in_use >= self.size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.metrics["timeouts"] += 1
+                            raise PoolTimeout()
+                        self.cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+                waited = (time.monotonic() - started) * 1000
+                self.metrics["wait_ms_total"] += waited
+                self.metrics["wait_ms_max"] = max(self.metrics["wait_ms_max"], waited)
+            self.in_use += 1
+            self.metrics["transactions"] += 1
+            self._mark_saturation()
+            while self.idle:
+                backend = self.idle.pop()
+                if backend.alive():
+                    return backend
+                backend.close()
+        try:
+            backend = Backend(self.params, self.settings)
+        except BaseException:
+            with self.cond:
+                self.in_use -= 1
+                self.metrics["connect_errors"] += 1
+                self._mark_saturation()
+                self.cond.notify()
+            raise
+        with self.cond:
+            self.metrics["connects"] += 1
+            if self.server_status is None:
+                self.server_status = dict(backend.status)
+        return backend
+
+    def release(self, backend, reusable=True):
+        reset = reusable and backend.dirty
+        if reset:
+            try:
+                reusable = backend.reset()
+            except (OSError, EOFError, ProtocolError):
+                reusable = False
+        with self.cond:
+            self.in_use -= 1
+            if reset:
+                self.metrics["resets"] += 1
+            if reusable:
+                backend.last_used = time.monotonic()
+                self.idle.append(backend)
+            else:
+                self.metrics["discarded"] += 1
+            self._mark_saturation()
+            self.cond.notify()
+        if not reusable:
+            backend.close()
+
+    def close_idle(self, now, max_idle=SERVER_IDLE):
+        with self.cond:
+            stale = [b for b in self.idle if now - b.last_used > max_idle]
+            self.idle = [b for b in self.idle if b not in stale]
+        for backend in stale:
+            backend.close()
+
+    def status(self):
+        with self.cond:
+            m = dict(self.metrics)
+            if self.saturated_since is not None:
+                m["saturated_ms"] += (time.monotonic() - self.saturated_since) * 1000
+            waited = m["waits"] - m["timeouts"] - self.waiting
+            m["wait_ms_avg"] = round(m["wait_ms_total"] / waited, 2) if waited > 0 else 0.0
+            for key in ("wait_ms_total", "wait_ms_max", "saturated_ms"):
+                m[key] = round(m[key], 2)
+            m.update(pool_size=self.size, in_use=self.in_use, idle=len(self.idle),
+                     waiting=self.waiting, max_rows=self.max_rows,
+                     statement_timeout_ms=self.settings["statement_timeout"])
+            return m
+
+
+class Session:
+    """One client connection (an MCP server's pg client)."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, proxy, conn):
+        self.proxy = proxy
+        self.client = Stream(conn)
+        self.pool = None
+        self.backend = None
+        self.key = struct.pack("!II", next(self._ids), secrets.randbits(31))
+
+    # --- startup ---
+
+    def startup(self):
+        while True:
+            payload = self.client.read_startup()
+            code = struct.unpack_from("!I", payload)[0]
+            if code in (SSL_REQUEST, GSSENC_REQUEST):
+                self.client.send(b"N")
+                continue
+            if code == CANCEL_REQUEST:
+                self.proxy.cancel(payload[4:12])
+                return False
+            if code >> 16 != 3:
+                raise ProtocolError("unsupported protocol version %d" % code)
+            break
+        items = payload[4:].split(b"\0")
+        params = dict(zip(items[0::2], items[1::2]))
+        name = params.get(b"database", b"").decode()
+        self.pool = self.proxy.pool(name)
+        if self.pool is None:
+            self.client.send(error_message("3D000", "pg-pool: no pool named \"%s\"" % name, "FATAL"))
+            return False
+
+        self.client.send(message(b"R", struct.pack("!I", 3)))
+        kind, payload, _ = self.client.read_message()
+        password = payload.rstrip(b"\0").decode("utf-8", "replace")
+        expected = load_json(CONFIG_PATH, {}).get("password", "")
+        if (kind != b"p" or params.get(b"user") != PROXY_USER.encode()
+                or not expected or not hmac.compare_digest(password, expected)):
+            self.client.send(error_message("28P01", "pg-pool: password authentication failed", "FATAL"))
+            return False
+
+        if self.pool.server_status is None:
+            # Learn server_version, encodings etc. from a first real connection.
+            try:
+                self.pool.release(self.pool.acquire())
+            except (OSError, EOFError, ProtocolError, DatabaseError, PoolTimeout) as e:
+                self.client.send(error_message("08006", "pg-pool: cannot reach %s: %s" % (name, e), "FATAL"))
+                return False
+        out = [message(b"R", struct.pack("!I", 0))]
+        for key, value in self.pool.server_status.items():
+            out.append(message(b"S", key + b"\0" + value + b"\0"))
+        out.append(message(b"K", self.key))
+        out.append(message(b"Z", b"I"))
+        self.client.send(b"".join(out))
+        return True
+
+    # --- traffic ---
+
+    def run(self):
+        pool = self.pool
+        pending = 0          # Query/Sync messages sent that have not had ReadyForQuery yet
+        discarding = False   # after a pool timeout, drop the rest of an extended-protocol batch
+        rows = 0
+        truncated = False
+        try:
+            while True:
+                streams = [self.client] + ([self.backend.stream] if self.backend else [])
+                ready = [s for s in streams if s.buffered()]
+                if not ready:
+                    ready, _, _ = select.select(streams, [], [])
+                    for s in ready:
+                        s.fill()
+                    ready = [s for s in ready if s.buffered()]
+
+                if self.client in ready:
+                    to_backend = []
+                    while self.client.buffered():
+                        kind, payload, raw = self.client.read_message()
+                        if kind == b"X":
+                            return
+                        if discarding:
+                            if kind == b"S":
+                                discarding = False
+                                self.client.send(message(b"Z", b"I"))
+                            continue
+                        if self.backend is None:
+                            try:
+                                self.backend = pool.acquire()
+                            except PoolTimeout:
+                                self.client.send(error_message(
+                                    "53300", "pg-pool: all %d connections to %s busy for %ss"
+                                    % (pool.size, pool.name, pool.wait_timeout)))
+                                if kind == b"Q":
+                                    self.client.send(message(b"Z", b"I"))
+                                elif kind != b"S":
+                                    discarding = True
+                                else:
+                                    self.client.send(message(b"Z", b"I"))
+                                continue
+                            except (OSError, EOFError, ProtocolError, DatabaseError) as e:
+                                self.client.send(error_message("08006", "pg-pool: %s" % e, "FATAL"))
+                                return
+                        if kind in (b"Q", b"S"):
+                            pending += 1
+                        self.backend.note(kind, payload)
+                        to_backend.append(raw)
+                    if to_backend:
+                        self.backend.stream.send(b"".join(to_backend))
+
+                if self.backend and self.backend.stream in ready:
+                    to_client = []
+                    release = False
+                    while self.backend.stream.buffered():
+                        kind, payload, raw = self.backend.stream.read_message()
+                        if kind == b"D":
+                            rows += 1
+                            if rows > pool.max_rows:
+                                truncated = True
+                                continue
+                        elif kind in (b"T", b"C", b"s", b"E", b"I", b"Z"):
+                            if truncated and kind in (b"C", b"s"):
+                                to_client.append(notice_message(
+                                    "pg-pool: result truncated to %d rows (max_rows)" % pool.max_rows))
+                                with pool.cond:
+                                    pool.metrics["truncated_results"] += 1
+                            rows, truncated = 0, False
+                        to_client.append(raw)
+                        if kind == b"Z":
+                            pending -= 1
+                            if pending <= 0 and payload == b"I":
+                                pending = 0
+                                release = True
+                                break
+                    self.client.send(b"".join(to_client))
+                    if release:
+                        backend, self.backend = self.backend, None
+                        pool.release(backend)
+        except EOFError:
+            return
+        finally:
+            if self.backend:
+                # Client left mid-transaction or the server went away: don't reuse.
+                pool.release(self.backend, reusable=False)
+                self.backend = None
+
+
+class Proxy:
+    def __init__(self, linger=LINGER):
+        self.pools = {}
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.linger = linger
+        self.last_active = time.monotonic()
+        self.stopping = threading.Event()
+
+    def pool(self, name):
+        with self.lock:
+            if name not in self.pools:
+                spec = load_json(CONFIG_PATH, {}).get("pools", {}).get(name)
+                if spec is None:
+                    return None
+                self.pools[name] = Pool(name, spec)
+            return self.pools[name]
+
+    def cancel(self, key):
+        with self.lock:
+            session = self.sessions.get(key)
+        backend = session and session.backend
+        if backend:
+            try:
+                backend.cancel()
+            except OSError as e:
+                log("cancel failed: %s" % e)
+
+    def handle_client(self, conn):
+        session = Session(self, conn)
+        try:
+            if not session.startup():
+                return
+            with self.lock:
+                self.sessions[session.key] = session
+            with session.pool.cond:
+                session.pool.metrics["clients"] += 1
+                session.pool.metrics["clients_total"] += 1
+            try:
+                session.run()
+            finally:
+                with session.pool.cond:
+                    session.pool.metrics["clients"] -= 1
+                with self.lock:
+                    self.sessions.pop(session.key, None)
+                    self.last_active = time.monotonic()
+        except (OSError, EOFError, ProtocolError) as e:
+            log("client error: %s" % e)
+        finally:
+            session.client.close()
+
+    def handle_control(self, conn):
+        with conn:
+            request = json.loads(conn.makefile("rb").readline() or b"{}")
+            command = request.get("control")
+            if command == "status":
+                with self.lock:
+                    pools = list(self.pools.values())
+                conn.sendall(encode({p.name: p.status() for p in pools}))
+            elif command == "stop":
+                conn.sendall(encode({"stopping": True}))
+                self.stopping.set()
+            else:
+                conn.sendall(encode({"ok": True}))
+
+    def reaper(self):
+        while not self.stopping.wait(5):
+            now = time.monotonic()
+            with self.lock:
+                pools = list(self.pools.values())
+                busy = bool(self.sessions)
+            for pool in pools:
+                pool.close_idle(now)
+            if busy:
+                self.last_active = now
+            elif now - self.last_active > self.linger:
+                log("no clients for %ds, exiting" % self.linger)
+                self.stopping.set()
+
+    def _accept_loop(self, server, handler):
+        server.settimeout(1)
+        while not self.stopping.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            conn.settimeout(None)
+            threading.Thread(target=handler, args=(conn,), daemon=True).start()
+
+    def serve(self):
+        lock = open(LOCK_PATH, "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0  # another daemon is running
+        listen = load_json(CONFIG_PATH, {}).get("listen")
+        if not listen:
+            log("no 'listen' address in %s; run: pg-pool.py register <server>" % CONFIG_PATH)
+            return 1
+        host, port = listen.rsplit(":", 1)
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            listener.bind((host, int(port)))
+        except OSError as e:
+            log("cannot listen on %s: %s. Set a free host:port as 'listen' in %s, "
+                "then run register again for each server" % (listen, e.strerror or e, CONFIG_PATH))
+            listener.close()
+            return 1
+        listener.listen(128)
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+        control_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        control_sock.bind(SOCKET_PATH)
+        os.chmod(SOCKET_PATH, 0o600)
+        control_sock.listen(16)
+        log("pg-pool listening on %s:%s (pid %d)" % (host, port, os.getpid()))
+        threading.Thread(target=self.reaper, daemon=True).start()
+        threading.Thread(target=self._accept_loop, args=(control_sock, self.handle_control),
+                         daemon=True).start()
+        try:
+            self._accept_loop(listener, self.handle_client)
+        finally:
+            listener.close()
+            control_sock.close()
+            os.unlink(SOCKET_PATH)
+            for pool in self.pools.values():
+                pool.close_idle(float("inf"), max_idle=-1)
+            log("pg-pool stopped")
+        return 0
+
+
+# ------------------------------------------------------------
+#   Client side
+# ------------------------------------------------------------
+
+def log_tail():
+    try:
+        with open(LOG_PATH, "rb") as f:
+            f.seek(max(0, os.path.getsize(LOG_PATH) - 4096))
+            lines = f.read().decode("utf-8", "replace").strip().splitlines()
+    except OSError:
+        return ""
+    return lines[-1] if lines else ""
+
+
+def free_listen_address():
+    """A loopback host:port nothing is listening on right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((LISTEN_HOST, 0))
+        return "%s:%d" % (LISTEN_HOST, sock.getsockname()[1])
+
+
+def control(command, autostart=False, timeout=10):
+    deadline = time.monotonic() + timeout
+    daemon = None
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(SOCKET_PATH)
+            with sock:
+                sock.sendall(encode({"control": command}))
+                return json.loads(sock.makefile("rb").readline() or b"null")
+        except OSError:
+            sock.close()
+            if not autostart:
+                return None
+        if daemon is None:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(LOG_PATH, "ab") as logf:
+                daemon = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve"],
+                                          stdin=subprocess.DEVNULL, stdout=logf, stderr=logf,
+                                          start_new_session=True)
+        elif daemon.poll():
+            # Exit code 0 means another daemon holds the lock; keep waiting for it
+            raise SystemExit("pg-pool: daemon failed to start: %s" % (log_tail() or "see " + LOG_PATH))
+        if time.monotonic() > deadline:
+            raise SystemExit("pg-pool: daemon did not start, see " + LOG_PATH)
+        time.sleep(0.05)
+
+
+def launch(command):
+    """Make sure the daemon is up, then become the MCP server."""
+    if not command:
+        raise SystemExit("Usage: pg-pool.py launch -- <command> [args]")
+    control("ping", autostart=True)
+    os.execvp(command[0], command)
+
+
+def is_dsn(arg):
+    return arg.startswith(("postgres://", "postgresql://"))
+
+
+def register(name, options):
+    """Move a server's DSN into pg-pool.json and point the server at the proxy."""
+    desktop_path = claude_desktop_config()
+    desktop = load_json(desktop_path, {"mcpServers": {}})
+    entry = desktop.get("mcpServers", {}).get(name)
+    if entry is None:
+        raise SystemExit("No mcpServers entry named '%s' in %s" % (name, desktop_path))
+    config = load_json(CONFIG_PATH, {})
+    if not config.get("listen"):
+        config["listen"] = free_listen_address()
+    config.setdefault("password", secrets.token_urlsafe(24))
+    pools = config.setdefault("pools", {})
+
+    args = list(entry.get("args", []))
+    wrapped = args[:2] == [INSTALLED_PATH, "launch"]
+    inner = [entry["command"]] + args if not wrapped else args[args.index("--") + 1:]
+    proxy_prefix = "postgresql://%s:%s@" % (PROXY_USER, config["password"])
+    proxy_url = "%s%s/%s" % (proxy_prefix, config["listen"], urllib.parse.quote(name))
+    dsns = [i for i, arg in enumerate(inner) if is_dsn(arg)]
+    if not dsns:
+        raise SystemExit("No postgres:// URL in the '%s' args" % name)
+    # A proxy URL (possibly for an older listen address) is not a real DSN
+    if not inner[dsns[-1]].startswith(proxy_prefix):
+        pools.setdefault(name, {})["url"] = inner[dsns[-1]]
+    if name not in pools:
+        raise SystemExit("No DSN recorded for '%s'" % name)
+    pools[name].update({k: v for k, v in options.items() if v is not None})
+    inner[dsns[-1]] = proxy_url
+    save_json(CONFIG_PATH, config)
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    if os.path.abspath(__file__) != INSTALLED_PATH:
+        shutil.copy2(os.path.abspath(__file__), INSTALLED_PATH)
+    entry["command"] = sys.executable
+    entry["args"] = [INSTALLED_PATH, "launch", "--"] + inner
+    save_json(desktop_path, desktop)
+    spec = pools[name]
+    print("%s now connects through pg-pool on %s (pool %d, statement_timeout %dms, max_rows %d)" % (
+        name, config["listen"], spec.get("pool_size", DEFAULT_POOL_SIZE),
+        spec.get("statement_timeout", DEFAULT_STATEMENT_TIMEOUT), spec.get("max_rows", DEFAULT_MAX_ROWS)))
+
+
+def unregister(name):
+    desktop_path = claude_desktop_config()
+    desktop = load_json(desktop_path, {"mcpServers": {}})
+    entry = desktop.get("mcpServers", {}).get(name)
+    config = load_json(CONFIG_PATH, {})
+    spec = config.get("pools", {}).pop(name, None)
+    if spec is None:
+        raise SystemExit("'%s' is not registered with pg-pool" % name)
+    if entry and (entry.get("args") or [None])[0] == INSTALLED_PATH:
+        inner = entry["args"][entry["args"].index("--") + 1:]
+        inner = [spec["url"] if is_dsn(arg) else arg for arg in inner]
+        entry["command"], entry["args"] = inner[0], inner[1:]
+        save_json(desktop_path, desktop)
+    save_json(CONFIG_PATH, config)
+    print("%s restored to a direct connection" % name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_reg = sub.add_parser("register", help="route a configured postgres server through the pool")
+    p_reg.add_argument("server")
+    p_reg.add_argument("--pool-size", type=int, help="max server connections (default %d)" % DEFAULT_POOL_SIZE)
+    p_reg.add_argument("--statement-timeout", type=int,
+                       help="default statement_timeout in ms (default %d)" % DEFAULT_STATEMENT_TIMEOUT)
+    p_reg.add_argument("--max-rows", type=int, help="rows returned per result set (default %d)" % DEFAULT_MAX_ROWS)
+    p_reg.add_argument("--wait-timeout", type=float,
+                       help="seconds a client waits for a free connection (default %d)" % DEFAULT_WAIT_TIMEOUT)
+    p_unreg = sub.add_parser("unregister", help="restore the server's direct connection")
+    p_unreg.add_argument("server")
+    p_launch = sub.add_parser("launch", help="start the daemon if needed, then exec the server")
+    p_launch.add_argument("command", nargs=argparse.REMAINDER)
+    p_serve = sub.add_parser("serve", help="run the daemon in the foreground")
+    p_serve.add_argument("--linger", type=int, default=LINGER)
+    sub.add_parser("status", help="print per-pool metrics as JSON")
+    sub.add_parser("stop", help="stop the daemon and close server connections")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "register":
+        register(args.server, {"pool_size": args.pool_size, "statement_timeout": args.statement_timeout,
+                               "max_rows": args.max_rows, "wait_timeout": args.wait_timeout})
+    elif args.cmd == "unregister":
+        unregister(args.server)
+    elif args.cmd == "launch":
+        launch(args.command[1:] if args.command[:1] == ["--"] else args.command)
+    elif args.cmd == "serve":
+        os.makedirs(STATE_DIR, exist_ok=True)
+        return Proxy(args.linger).serve()
+    else:
+        reply = control(args.cmd)
+        if reply is None:
+            print("pg-pool not running")
+            return 1
+        print(json.dumps(reply, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
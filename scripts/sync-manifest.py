@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# ============================================================
+#   Claude OS — Manifest-based component sync
+#   Copies agents, commands, skills, rules and hooks.json from
+#   a repo checkout into CLAUDE_CONFIG_DIR, touching only files
+#   that changed since the last install.
+#
+#   Usage:
+#     sync-manifest.py sync <repo>/.claude <claude-dir> [component ...]
+#
+#   Components are paths relative to .claude and may be globs,
+#   e.g. agents rules/python 'skills/backend-*'. Files from
+#   components that are no longer selected are removed.
+# ============================================================
+"""Incremental installer for the ``.claude`` tree.
+
+The manifest (``<claude-dir>/.claude-os-manifest.json``) records, for every
+file the installer placed, the hash of the content it wrote plus a stat
+cache of the source file. Re-runs then:
+
+- skip source files whose size/mtime match the cache (no re-hash),
+- copy only files whose source content changed,
+- delete files that disappeared from the repo,
+- never overwrite or delete a file the user edited after install.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+MANIFEST_NAME = ".claude-os-manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_COMPONENTS = ["agents", "commands", "skills", "rules", "hooks.json"]
+EXCLUDED_DIRS = {".venv", "node_modules", "__pycache__"}
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(dest):
+    path = os.path.join(dest, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # A corrupt manifest is treated like a first install.
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    return data.get("files", {})
+
+
+def write_manifest(dest, files):
+    path = os.path.join(dest, MANIFEST_NAME)
+    fd, tmp = tempfile.mkstemp(dir=dest, prefix=".manifest.")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f,
+                  separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, path)
+
+
+def iter_sources(src, components):
+    """Yield (relpath, abspath) for every file under the selected components."""
+    seen = set()
+    for component in components:
+        root = os.path.join(src, component)
+        if os.path.isfile(root):
+            paths = [root]
+        else:
+            paths = []
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS)
+                paths.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+        for abspath in paths:
+            rel = os.path.relpath(abspath, src).replace(os.sep, "/")
+            if rel not in seen:
+                seen.add(rel)
+                yield rel, abspath
+
+
+def copy_file(src, dest):
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix=".sync.")
+    os.close(fd)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def prune_empty_dirs(path, stop):
+    parent = os.path.dirname(path)
+    while parent != stop and parent.startswith(stop + os.sep):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            return
+        parent = os.path.dirname(parent)
+
+
+def sync(src, dest, components):
+    old = load_manifest(dest)
+    first_run = old is None
+    old = old or {}
+    files = {}
+    stats = dict(added=0, updated=0, unchanged=0, removed=0, kept=0)
+
+    for rel, src_path in iter_sources(src, components):
+        st = os.stat(src_path)
+        prev = old.get(rel)
+        if prev and prev["src_size"] == st.st_size and prev["src_mtime_ns"] == st.st_mtime_ns:
+            src_hash = prev["src_sha256"]
+        else:
+            src_hash = file_hash(src_path)
+        entry = {"sha256": src_hash, "src_sha256": src_hash,
+                 "src_size": st.st_size, "src_mtime_ns": st.st_mtime_ns}
+        dest_path = os.path.join(dest, rel)
+
+        if not os.path.exists(dest_path):
+            copy_file(src_path, dest_path)
+            stats["added"] += 1
+        elif prev and prev["sha256"] == src_hash:
+            # Source unchanged since we last wrote it: nothing to read or copy.
+            stats["unchanged"] += 1
+        else:
+            installed = file_hash(dest_path)
+            if installed == src_hash:
+                stats["unchanged"] += 1
+            elif first_run or (prev and installed == prev["sha256"]):
+                copy_file(src_path, dest_path)
+                stats["updated"] += 1
+            else:
+                # Edited after install: leave it, keep tracking what we wrote.
+                entry["sha256"] = prev["sha256"] if prev else None
+                stats["kept"] += 1
+        files[rel] = entry
+
+    for rel, prev in old.items():
+        if rel in files:
+            continue
+        dest_path = os.path.join(dest, rel)
+        if not os.path.isfile(dest_path):
+            continue
+        if prev["sha256"] and file_hash(dest_path) == prev["sha256"]:
+            os.unlink(dest_path)
+            prune_empty_dirs(dest_path, dest)
+            stats["removed"] += 1
+        else:
+            stats["kept"] += 1
+
+    write_manifest(dest, files)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_sync = sub.add_parser("sync", help="install changed files and update the manifest")
+    p_sync.add_argument("src", help="the repo's .claude directory")
+    p_sync.add_argument("dest", help="CLAUDE_CONFIG_DIR")
+    p_sync.add_argument("components", nargs="*", default=DEFAULT_COMPONENTS)
+
+    args = parser.parse_args(argv)
+    if args.cmd == "sync":
+        matches = {
+            pattern: glob.glob(os.path.join(args.src, pattern.rstrip("/")))
+            for pattern in args.components
+        }
+        # Defaults may be absent from a checkout; explicit selections must exist
+        if args.components is not DEFAULT_COMPONENTS:
+            unmatched = [pattern for pattern, paths in matches.items() if not paths]
+            if unmatched:
+                parser.error(f"no component matches: {', '.join(unmatched)}")
+        components = sorted({
+            os.path.relpath(path, args.src).replace(os.sep, "/")
+            for paths in matches.values()
+            for path in paths
+        })
+        if not components:
+            # Syncing nothing would remove every installed component
+            parser.error(f"no components to install under {args.src}")
+        s = sync(args.src, args.dest, components)
+        print(f"{s['added']} added, {s['updated']} updated, {s['unchanged']} unchanged, "
+              f"{s['removed']} removed, {s['kept']} user-modified kept")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
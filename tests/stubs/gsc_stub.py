@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Stand-in for ``python3 -m mcp_gsc`` that counts API calls.
+
+Every ``tools/call`` is appended to $STUB_LOG as one JSON line before it is
+answered, after $STUB_DELAY seconds (default 0.2). ``site_url`` picks the
+behaviour:
+
+  ...quota...      text error, the way mcp_gsc reports API failures
+  ...flagged...    an ``isError`` result
+  ...hang-once...  the first such call is never answered
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+DELAY = float(os.environ.get("STUB_DELAY", "0.2"))
+write_lock = threading.Lock()
+hung = set()
+
+
+def send(msg):
+    with write_lock:
+        sys.stdout.write(json.dumps(msg) + "\n")
+        sys.stdout.flush()
+
+
+def answer(msg_id, params):
+    args = params.get("arguments") or {}
+    site = args.get("site_url", "")
+    time.sleep(DELAY)
+    if "quota" in site:
+        result = {"content": [{"type": "text", "text": "Error retrieving search analytics: "
+                                                        "Quota exceeded for quota metric 'Queries'"}]}
+    elif "flagged" in site:
+        result = {"content": [{"type": "text", "text": "failed"}], "isError": True}
+    else:
+        result = {"content": [{"type": "text", "text": "%s %s" % (
+            params.get("name"), json.dumps(args, sort_keys=True))}]}
+    send({"jsonrpc": "2.0", "id": msg_id, "result": result})
+
+
+def main():
+    for line in sys.stdin:
+        msg = json.loads(line)
+        if "id" not in msg:
+            continue
+        if msg["method"] == "initialize":
+            send({"jsonrpc": "2.0", "id": msg["id"], "result": {
+                "protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                "serverInfo": {"name": "gsc-stub", "version": "1"}}})
+        elif msg["method"] == "tools/call":
+            params = msg.get("params") or {}
+            with open(os.environ["STUB_LOG"], "a") as f:
+                f.write(json.dumps(params) + "\n")
+            site = (params.get("arguments") or {}).get("site_url", "")
+            if "hang-once" in site and site not in hung:
+                hung.add(site)
+                continue
+            # Answer concurrently, like the real server's async tools
+            threading.Thread(target=answer, args=(msg["id"], params), daemon=True).start()
+        else:
+            send({"jsonrpc": "2.0", "id": msg["id"], "result": {}})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Minimal stdio MCP server for the supervisor tests.
+
+``tools/call`` arguments:
+  echo      text to return (with this process's pid and call count)
+  sleep     seconds to wait before answering
+  crash     exit immediately without answering
+  progress  send one notifications/progress for the request's token first
+
+Each call is appended to $STUB_LOG (if set) as one JSON line.
+"""
+
+import json
+import os
+import sys
+import time
+
+TAG = sys.argv[1] if len(sys.argv) > 1 else "stub"
+
+
+def send(msg):
+    sys.stdout.write(json.dumps(msg) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    calls = 0
+    for line in sys.stdin:
+        msg = json.loads(line)
+        if "id" not in msg or "method" not in msg:
+            continue
+        params = msg.get("params") or {}
+        if msg["method"] == "initialize":
+            result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                      "serverInfo": {"name": TAG, "version": str(os.getpid())}}
+        elif msg["method"] == "tools/call":
+            args = params.get("arguments") or {}
+            if os.environ.get("STUB_LOG"):
+                with open(os.environ["STUB_LOG"], "a") as f:
+                    f.write(json.dumps({"pid": os.getpid(), "name": params.get("name"), "arguments": args}) + "\n")
+            if args.get("crash"):
+                os._exit(3)
+            if args.get("progress"):
+                token = (params.get("_meta") or {}).get("progressToken")
+                send({"jsonrpc": "2.0", "method": "notifications/progress",
+                      "params": {"progressToken": token, "progress": 1, "total": 1}})
+            time.sleep(args.get("sleep", 0))
+            calls += 1
+            text = "%s %s pid=%d n=%d" % (TAG, args.get("echo", ""), os.getpid(), calls)
+            result = {"content": [{"type": "text", "text": text}]}
+        else:
+            send({"jsonrpc": "2.0", "id": msg["id"],
+                  "error": {"code": -32601, "message": "method not found"}})
+            continue
+        send({"jsonrpc": "2.0", "id": msg["id"], "result": result})
+
+
+if __name__ == "__main__":
+    main()
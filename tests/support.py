@@ -0,0 +1,134 @@
+"""Helpers shared by the tests."""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+STUBS = os.path.join(ROOT, "tests", "stubs")
+PYTHON = sys.executable
+
+
+def script(name):
+    return os.path.join(SCRIPTS, name)
+
+
+def stub(name):
+    return os.path.join(STUBS, name)
+
+
+def load_script(name):
+    """Import a scripts/ file (their names contain dashes) as a module."""
+    spec = importlib.util.spec_from_file_location(name[:-3].replace("-", "_"), script(name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def isolated_env(tmp):
+    """Environment whose Claude and XDG config dirs live under ``tmp``."""
+    return dict(os.environ,
+                CLAUDE_CONFIG_DIR=os.path.join(tmp, "claude"),
+                XDG_CONFIG_HOME=os.path.join(tmp, "xdg"),
+                HOME=tmp)
+
+
+def wait_for(predicate, timeout=10, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(interval)
+    return predicate()
+
+
+class McpSession:
+    """A JSON-RPC client talking to an MCP command over its stdio."""
+
+    def __init__(self, argv, env, name="test"):
+        self.proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, env=env)
+        self.responses = {}
+        self.notifications = []
+        self.cond = threading.Condition()
+        threading.Thread(target=self._read, daemon=True).start()
+        self.init = self.request(0, "initialize", {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": name, "version": "0"}})
+        self.notify("notifications/initialized")
+
+    def _read(self):
+        for line in self.proc.stdout:
+            msg = json.loads(line)
+            with self.cond:
+                if "id" in msg and "method" not in msg:
+                    self.responses[msg["id"]] = msg
+                else:
+                    self.notifications.append(msg)
+                self.cond.notify_all()
+
+    def send(self, msg):
+        self.proc.stdin.write((json.dumps(dict(msg, jsonrpc="2.0")) + "\n").encode())
+        self.proc.stdin.flush()
+
+    def notify(self, method, params=None):
+        self.send({"method": method, "params": params or {}})
+
+    def start(self, msg_id, method, params=None):
+        self.send({"id": msg_id, "method": method, "params": params or {}})
+
+    def wait(self, msg_id, timeout=15):
+        with self.cond:
+            if not self.cond.wait_for(lambda: msg_id in self.responses, timeout):
+                raise AssertionError("no response to request %r" % (msg_id,))
+            return self.responses.pop(msg_id)
+
+    def request(self, msg_id, method, params=None, timeout=15):
+        self.start(msg_id, method, params)
+        return self.wait(msg_id, timeout)
+
+    def call(self, msg_id, name, arguments=None, meta=None, timeout=15):
+        params = {"name": name, "arguments": arguments or {}}
+        if meta:
+            params["_meta"] = meta
+        return self.request(msg_id, "tools/call", params, timeout)
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc.stdout.close()
+        self.proc.stderr.close()
+
+
+def text(response):
+    return response["result"]["content"][0]["text"]
+
+
+def stop_process(proc):
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def tempdir(testcase):
+    tmp = tempfile.TemporaryDirectory(prefix="claude-os-test-")
+    testcase.addCleanup(tmp.cleanup)
+    return tmp.name
+
@@ -0,0 +1,119 @@
+"""scripts/cas-store.py: linking template trees through the shared store."""
+
+import contextlib
+import io
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from support import load_script, tempdir
+
+cas = load_script("cas-store.py")
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def no_reflink(src, dest):
+    raise OSError(95, "Operation not supported")
+
+
+def fake_reflink(src, dest):
+    shutil.copyfile(src, dest)
+
+
+class CasStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempdir(self)
+        store = os.path.join(tmp, "store")
+        patcher = mock.patch.multiple(cas, STORE=store, BLOBS=os.path.join(store, "blobs"),
+                                      PROJECTS=os.path.join(store, "projects.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tmp
+        self.src = os.path.join(tmp, "template")
+        write(os.path.join(self.src, "README.md"), "readme")
+        write(os.path.join(self.src, "src/app.py"), "print('app')")
+        write(os.path.join(self.src, "ext/myskill/SKILL.md"), "skill")
+        os.symlink("../ext/myskill", os.path.join(self.src, "src/linked"))
+        os.symlink("README.md", os.path.join(self.src, "README.link"))
+
+    def project(self, name):
+        return os.path.join(self.tmp, name)
+
+    def run_cas(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(cas.main(list(argv)), 0)
+        return out.getvalue()
+
+    def link(self, name, mode):
+        return self.run_cas("link", self.src, self.project(name), "--mode", mode)
+
+    def blobs(self):
+        return sorted(cas.walk_files(cas.BLOBS)) if os.path.isdir(cas.BLOBS) else []
+
+    def test_symlinks_are_recreated_including_directories(self):
+        self.link("p", "copy")
+        p = self.project("p")
+        self.assertEqual(os.readlink(os.path.join(p, "src/linked")), "../ext/myskill")
+        self.assertEqual(os.readlink(os.path.join(p, "README.link")), "README.md")
+        self.assertEqual(read(os.path.join(p, "src/linked/SKILL.md")), "skill")
+
+    def test_auto_without_reflink_copies_past_the_store(self):
+        with mock.patch.object(cas, "reflink", no_reflink):
+            self.assertEqual(self.link("p", "auto").strip(), "3 copy")
+        self.assertEqual(read(os.path.join(self.project("p"), "src/app.py")), "print('app')")
+        self.assertEqual(self.blobs(), [])
+        self.assertEqual(cas.load_projects(), [])
+
+    def test_auto_with_reflink_goes_through_the_store(self):
+        with mock.patch.object(cas, "reflink", fake_reflink):
+            self.assertEqual(self.link("p", "auto").strip(), "3 reflink")
+        self.assertEqual(len(self.blobs()), 3)
+        self.assertEqual(cas.load_projects(), [self.project("p")])
+
+    def test_gc_keeps_blobs_until_no_project_links_them(self):
+        self.link("a", "hard")
+        self.link("b", "symlink")
+        self.assertEqual(len(self.blobs()), 3)
+        self.assertIn("removed 0 blobs", self.run_cas("gc"))
+        shutil.rmtree(self.project("a"))
+        self.assertIn("removed 0 blobs", self.run_cas("gc"))
+        shutil.rmtree(self.project("b"))
+        self.assertIn("would remove 3 blobs", self.run_cas("gc", "--dry-run"))
+        self.assertEqual(len(self.blobs()), 3)
+        self.assertIn("removed 3 blobs", self.run_cas("gc"))
+        self.assertEqual(self.blobs(), [])
+        self.assertEqual(cas.load_projects(), [])
+
+    def test_detach_gives_a_private_copy(self):
+        self.link("a", "hard")
+        self.link("b", "symlink")
+        hard = os.path.join(self.project("a"), "src/app.py")
+        soft = os.path.join(self.project("b"), "src/app.py")
+        self.assertEqual(os.stat(hard).st_nlink, 2)
+        self.run_cas("detach", self.project("a"), soft)
+        for path in (hard, soft):
+            self.assertFalse(os.path.islink(path))
+            self.assertEqual(os.stat(path).st_nlink, 1)
+            self.assertTrue(os.stat(path).st_mode & 0o200)
+            self.assertEqual(read(path), "print('app')")
+            write(path, "edited")
+        # The directory symlink is the template's own, not a store link
+        self.assertTrue(os.path.islink(os.path.join(self.project("a"), "src/linked")))
+        self.assertEqual([read(b) for b in self.blobs() if read(b).startswith("print")],
+                         ["print('app')"])
+
+
+if __name__ == "__main__":
+    unittest.main()
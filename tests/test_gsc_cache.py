@@ -0,0 +1,110 @@
+"""scripts/gsc-cache.py proxy against tests/stubs/gsc_stub.py."""
+
+import json
+import os
+import subprocess
+import time
+import unittest
+
+from support import PYTHON, McpSession, isolated_env, script, stub, tempdir, text
+
+GSC_CACHE = script("gsc-cache.py")
+SITE = "https://example.com/"
+ANALYTICS = {"site_url": SITE, "start_date": "2024-01-01", "end_date": "2024-01-31",
+             "dimensions": "query"}
+
+
+class GscCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempdir(self)
+        self.env = isolated_env(tmp)
+        self.env["STUB_LOG"] = self.log = os.path.join(tmp, "api.log")
+        open(self.log, "w").close()
+
+    def proxy(self):
+        s = McpSession([PYTHON, GSC_CACHE, "proxy", "--", PYTHON, stub("gsc_stub.py")], self.env)
+        self.addCleanup(s.close)
+        return s
+
+    def api_calls(self):
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    def stats(self):
+        out = subprocess.run([PYTHON, GSC_CACHE, "stats"], env=self.env, capture_output=True,
+                             text=True, check=True).stdout
+        return json.loads(out)
+
+    def test_repeat_call_is_a_hit(self):
+        s = self.proxy()
+        first = s.call(1, "get_advanced_search_analytics", ANALYTICS)
+        # Same query spelled differently: site case, list form of dimensions
+        second = s.call(2, "get_advanced_search_analytics",
+                        dict(ANALYTICS, site_url="https://EXAMPLE.com", dimensions=["query"]))
+        self.assertEqual(text(first), text(second))
+        self.assertEqual(self.api_calls(), 1)
+        st = self.stats()
+        self.assertEqual((st["hits"], st["misses"], st["stores"]), (1, 1, 1))
+
+    def test_cache_survives_a_new_session(self):
+        self.proxy().call(1, "get_advanced_search_analytics", ANALYTICS)
+        self.proxy().call(1, "get_advanced_search_analytics", ANALYTICS)
+        self.assertEqual(self.api_calls(), 1)
+
+    def test_different_arguments_miss(self):
+        s = self.proxy()
+        s.call(1, "get_advanced_search_analytics", ANALYTICS)
+        s.call(2, "get_advanced_search_analytics", dict(ANALYTICS, dimensions="page"))
+        self.assertEqual(self.api_calls(), 2)
+        self.assertEqual(self.stats()["misses"], 2)
+
+    def test_identical_calls_in_flight_are_coalesced(self):
+        s = self.proxy()
+        for i in range(1, 6):
+            s.start(i, "tools/call", {"name": "get_advanced_search_analytics", "arguments": ANALYTICS})
+        replies = {text(s.wait(i)) for i in range(1, 6)}
+        self.assertEqual(len(replies), 1)
+        self.assertEqual(self.api_calls(), 1)
+        self.assertEqual(self.stats()["coalesced"], 4)
+
+    def test_errors_are_not_cached(self):
+        s = self.proxy()
+        for site in ("https://quota.example/", "https://flagged.example/"):
+            args = dict(ANALYTICS, site_url=site)
+            s.call(1, "get_advanced_search_analytics", args)
+            s.call(2, "get_advanced_search_analytics", args)
+        self.assertEqual(self.api_calls(), 4)
+        self.assertEqual(self.stats()["stores"], 0)
+
+    def test_writes_invalidate_the_site(self):
+        s = self.proxy()
+        s.call(1, "get_advanced_search_analytics", ANALYTICS)
+        s.call(2, "submit_sitemap", {"site_url": SITE, "sitemap_url": SITE + "sitemap.xml"})
+        s.call(3, "get_advanced_search_analytics", ANALYTICS)
+        self.assertEqual(self.api_calls(), 3)
+        self.assertEqual(self.stats()["invalidated"], 1)
+
+    def test_cancelled_leader_still_answers_waiters(self):
+        s = self.proxy()
+        s.start(1, "tools/call", {"name": "get_advanced_search_analytics", "arguments": ANALYTICS})
+        s.start(2, "tools/call", {"name": "get_advanced_search_analytics", "arguments": ANALYTICS})
+        s.notify("notifications/cancelled", {"requestId": 1})
+        self.assertIn("get_advanced_search_analytics", text(s.wait(2)))
+        time.sleep(0.3)
+        self.assertNotIn(1, s.responses)
+        self.assertEqual(self.api_calls(), 1)
+
+    def test_cancelled_call_does_not_block_the_next_one(self):
+        s = self.proxy()
+        args = dict(ANALYTICS, site_url="https://hang-once.example/")
+        s.start(1, "tools/call", {"name": "get_advanced_search_analytics", "arguments": args})
+        time.sleep(0.2)
+        s.notify("notifications/cancelled", {"requestId": 1})
+        # Without the cancellation handling this would wait on request 1 forever
+        reply = s.call(2, "get_advanced_search_analytics", args, timeout=5)
+        self.assertIn("hang-once", text(reply))
+        self.assertEqual(self.api_calls(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
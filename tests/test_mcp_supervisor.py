@@ -0,0 +1,134 @@
+"""scripts/mcp-supervisor.py against tests/stubs/mcp_stub.py."""
+
+import json
+import os
+import subprocess
+import time
+import unittest
+
+from support import PYTHON, McpSession, isolated_env, script, stub, tempdir, text, wait_for
+
+SUPERVISOR = script("mcp-supervisor.py")
+
+
+class SupervisorTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempdir(self)
+        self.env = isolated_env(tmp)
+        self.state = os.path.join(self.env["CLAUDE_CONFIG_DIR"], "mcp")
+        os.makedirs(self.state)
+        self.configure(pool=1, idle=600)
+        self.daemon = subprocess.Popen([PYTHON, SUPERVISOR, "serve", "--linger", "60"],
+                                       env=self.env, stderr=subprocess.DEVNULL)
+        self.addCleanup(self.stop_daemon)
+        sock = os.path.join(self.state, "supervisor.sock")
+        self.assertTrue(wait_for(lambda: os.path.exists(sock)), "daemon did not start")
+
+    def stop_daemon(self):
+        subprocess.run([PYTHON, SUPERVISOR, "stop"], env=self.env, capture_output=True)
+        try:
+            self.daemon.wait(10)
+        except subprocess.TimeoutExpired:
+            self.daemon.kill()
+            self.daemon.wait()
+
+    def configure(self, pool, idle, tag="stub", argv=None):
+        argv = argv or [PYTHON, stub("mcp_stub.py"), tag]
+        spec = {"command": argv[0], "args": argv[1:], "pool": pool, "idle_timeout": idle}
+        path = os.path.join(self.state, "supervisor.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"servers": {"stub": spec}}, f)
+        os.replace(path + ".tmp", path)
+
+    def session(self, name="test"):
+        s = McpSession([PYTHON, SUPERVISOR, "connect", "stub"], self.env, name)
+        self.addCleanup(s.close)
+        return s
+
+    def status(self):
+        out = subprocess.run([PYTHON, SUPERVISOR, "status"], env=self.env,
+                             capture_output=True, text=True, check=True).stdout
+        return json.loads(out)["stub"]
+
+    def test_clients_share_one_process_with_overlapping_ids(self):
+        a, b = self.session("a"), self.session("b")
+        self.assertEqual(a.init["result"], b.init["result"])
+        # Both clients use the same request ids; each must get its own answers
+        for s, name in ((a, "a"), (b, "b")):
+            for i in range(1, 4):
+                s.start(i, "tools/call", {"name": "x", "arguments": {"echo": name, "sleep": 0.05}})
+        replies = {(name, i): text(s.wait(i)) for s, name in ((a, "a"), (b, "b")) for i in range(1, 4)}
+        pids = {reply.split("pid=")[1].split()[0] for reply in replies.values()}
+        self.assertEqual(len(pids), 1)
+        for (name, _), reply in replies.items():
+            self.assertTrue(reply.startswith("stub %s " % name), reply)
+        m = self.status()
+        self.assertEqual(m["spawns"], 1)
+        self.assertEqual(m["requests"], 6)
+        self.assertEqual(m["clients"], 2)
+
+    def test_progress_tokens_are_kept_per_client(self):
+        a, b = self.session("a"), self.session("b")
+        # Both requests are in flight at once with the same token
+        for s in (a, b):
+            s.start(1, "tools/call", {"name": "x", "arguments": {"progress": True, "sleep": 0.3},
+                                      "_meta": {"progressToken": "t"}})
+        for s in (a, b):
+            s.wait(1)
+        for s in (a, b):
+            progress = [n for n in s.notifications if n["method"] == "notifications/progress"]
+            self.assertEqual(len(progress), 1)
+            self.assertEqual(progress[0]["params"]["progressToken"], "t")
+
+    def test_crash_fails_in_flight_request_and_next_request_respawns(self):
+        s = self.session()
+        first = text(s.call(1, "x"))
+        crashed = s.call(2, "x", {"crash": True})
+        self.assertIn("exited", crashed["error"]["message"])
+        second = text(s.call(3, "x"))
+        self.assertNotEqual(first.split("pid=")[1], second.split("pid=")[1])
+        m = self.status()
+        self.assertEqual(m["crashes"], 1)
+        self.assertEqual(m["spawns"], 2)
+
+    def test_server_exiting_before_initialize_fails_at_once(self):
+        self.configure(pool=1, idle=600, argv=["sh", "-c", "sleep 0.5; exit 1"])
+        started = time.monotonic()
+        s = self.session()
+        self.assertIn("failed to start", s.init["error"]["message"])
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_idle_process_is_evicted_and_respawned(self):
+        self.configure(pool=1, idle=1)
+        s = self.session()
+        s.call(1, "x")
+        # The reaper runs every 5 seconds
+        self.assertTrue(wait_for(lambda: self.status()["evictions"] == 1, timeout=15))
+        self.assertEqual(self.status()["instances"], [])
+        s.call(2, "x")
+        self.assertEqual(self.status()["spawns"], 2)
+
+    def test_pool_spreads_concurrent_clients(self):
+        self.configure(pool=2, idle=600)
+        a = self.session("a")
+        a.start(1, "tools/call", {"name": "x", "arguments": {"sleep": 1}})
+        time.sleep(0.2)
+        # a's process is busy, so b's handshake starts a second one
+        b = self.session("b")
+        pid_b = text(b.call(1, "x")).split("pid=")[1]
+        pid_a = text(a.wait(1)).split("pid=")[1]
+        self.assertNotEqual(pid_a, pid_b)
+        self.assertEqual(self.status()["spawns"], 2)
+
+    def test_changed_spec_applies_to_new_clients(self):
+        old = self.session("old")
+        self.assertTrue(text(old.call(1, "x")).startswith("stub "))
+        self.configure(pool=1, idle=600, tag="v2")
+        new = self.session("new")
+        self.assertTrue(text(new.call(1, "x")).startswith("v2 "))
+        # The session attached before the change keeps its process
+        self.assertTrue(text(old.call(2, "x")).startswith("stub "))
+
+
+if __name__ == "__main__":
+    unittest.main()
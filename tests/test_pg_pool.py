@@ -0,0 +1,241 @@
+"""scripts/pg-pool.py against a throwaway PostgreSQL cluster.
+
+Skipped unless ``postgres`` and ``initdb`` are on PATH (or in
+``pg_config --bindir``) and the tests are not running as root.
+"""
+
+import json
+import os
+import shutil
+import socket
+import struct
+import subprocess
+import tempfile
+import time
+import unittest
+
+from support import PYTHON, isolated_env, script, stop_process, tempdir, wait_for
+
+PG_POOL = script("pg-pool.py")
+
+
+def postgres_bindir():
+    found = shutil.which("postgres")
+    if found and shutil.which("initdb"):
+        return os.path.dirname(found)
+    try:
+        bindir = subprocess.run(["pg_config", "--bindir"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    if all(os.access(os.path.join(bindir, tool), os.X_OK) for tool in ("postgres", "initdb")):
+        return bindir
+    return None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def message(kind, payload=b""):
+    return kind + struct.pack("!I", len(payload) + 4) + payload
+
+
+class PgClient:
+    """Just enough of the frontend protocol: cleartext auth and simple queries."""
+
+    def __init__(self, port, database, user, password):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=30)
+        self.buf = b""
+        self.notices = []
+        body = struct.pack("!I", 196608) + b"user\0%s\0database\0%s\0\0" % (
+            user.encode(), database.encode())
+        self.sock.sendall(struct.pack("!I", len(body) + 4) + body)
+        while True:
+            kind, payload = self._read()
+            if kind == b"R" and struct.unpack("!I", payload[:4])[0] == 3:
+                self.sock.sendall(message(b"p", password.encode() + b"\0"))
+            elif kind == b"E":
+                raise RuntimeError(self._fields(payload))
+            elif kind == b"Z":
+                return
+
+    def _recv(self, n):
+        while len(self.buf) < n:
+            data = self.sock.recv(65536)
+            if not data:
+                raise EOFError("connection closed")
+            self.buf += data
+        out, self.buf = self.buf[:n], self.buf[n:]
+        return out
+
+    def _read(self):
+        header = self._recv(5)
+        return header[:1], self._recv(struct.unpack("!I", header[1:])[0] - 4)
+
+    @staticmethod
+    def _fields(payload):
+        return {f[:1].decode(): f[1:].decode() for f in payload.split(b"\0") if f}
+
+    def query(self, sql):
+        """Return (rows, error fields or None, transaction status)."""
+        self.sock.sendall(message(b"Q", sql.encode() + b"\0"))
+        rows, error = [], None
+        while True:
+            kind, payload = self._read()
+            if kind == b"D":
+                count = struct.unpack("!H", payload[:2])[0]
+                row, pos = [], 2
+                for _ in range(count):
+                    size = struct.unpack("!i", payload[pos:pos + 4])[0]
+                    pos += 4
+                    row.append(None if size < 0 else payload[pos:pos + size].decode())
+                    pos += max(size, 0)
+                rows.append(row)
+            elif kind == b"E":
+                error = self._fields(payload)
+            elif kind == b"N":
+                self.notices.append(self._fields(payload)["M"])
+            elif kind == b"Z":
+                return rows, error, payload.decode()
+
+    def scalar(self, sql):
+        rows, error, _ = self.query(sql)
+        if error:
+            raise AssertionError("%s: %s" % (sql, error.get("M")))
+        return rows[0][0]
+
+    def close(self):
+        try:
+            self.sock.sendall(message(b"X"))
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class PgPoolTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        bindir = postgres_bindir()
+        if bindir is None:
+            raise unittest.SkipTest("no postgres binary")
+        if os.geteuid() == 0:
+            raise unittest.SkipTest("postgres refuses to run as root")
+        tmp = tempfile.TemporaryDirectory(prefix="claude-os-pg-")
+        cls.addClassCleanup(tmp.cleanup)
+        cls.tmp = tmp.name
+        cls.dsn = cls.start_postgres(bindir)
+
+    @classmethod
+    def start_postgres(cls, bindir):
+        data = os.path.join(cls.tmp, "data")
+        subprocess.run([os.path.join(bindir, "initdb"), "-D", data, "-U", "test", "-A", "trust",
+                        "--no-sync"], check=True, capture_output=True)
+        port = free_port()
+        server = subprocess.Popen(
+            [os.path.join(bindir, "postgres"), "-D", data, "-p", str(port), "-k", cls.tmp,
+             "-c", "listen_addresses=127.0.0.1", "-c", "fsync=off"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        cls.addClassCleanup(stop_process, server)
+
+        def ready():
+            try:
+                PgClient(port, "postgres", "test", "").close()
+                return True
+            except (OSError, EOFError, RuntimeError):
+                return False
+
+        if not wait_for(ready, timeout=30, interval=0.2):
+            raise RuntimeError("postgres did not start")
+        return "postgresql://test@127.0.0.1:%d/postgres" % port
+
+    def setUp(self):
+        self.env = isolated_env(tempdir(self))
+        desktop = os.path.join(self.env["XDG_CONFIG_HOME"], "claude", "claude_desktop_config.json")
+        os.makedirs(os.path.dirname(desktop))
+        with open(desktop, "w") as f:
+            json.dump({"mcpServers": {"db": {
+                "command": "npx", "args": ["-y", "@modelcontextprotocol/server-postgres", self.dsn]}}}, f)
+        subprocess.run([PYTHON, PG_POOL, "register", "db", "--pool-size", "1", "--wait-timeout", "1",
+                        "--max-rows", "5", "--statement-timeout", "1000"],
+                       env=self.env, check=True, capture_output=True)
+        with open(os.path.join(self.env["CLAUDE_CONFIG_DIR"], "mcp", "pg-pool.json")) as f:
+            config = json.load(f)
+        self.port = int(config["listen"].rsplit(":", 1)[1])
+        self.password = config["password"]
+        daemon = subprocess.Popen([PYTHON, PG_POOL, "serve"], env=self.env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(stop_process, daemon)
+        self.assertTrue(wait_for(lambda: self.status() is not None), "pg-pool did not start")
+
+    def status(self):
+        out = subprocess.run([PYTHON, PG_POOL, "status"], env=self.env, capture_output=True, text=True)
+        return json.loads(out.stdout) if out.returncode == 0 else None
+
+    def client(self):
+        c = PgClient(self.port, "db", "claude", self.password)
+        self.addCleanup(c.close)
+        return c
+
+    def test_clients_reuse_one_connection_between_transactions(self):
+        clients = [self.client() for _ in range(5)]
+        pids = {c.scalar("select pg_backend_pid()") for c in clients for _ in range(2)}
+        self.assertEqual(len(pids), 1)
+        pool = self.status()["db"]
+        self.assertEqual(pool["in_use"], 0)
+        self.assertEqual(pool["idle"], 1)
+        self.assertEqual(pool["resets"], 0)
+
+    def test_transaction_holds_its_connection(self):
+        a, b = self.client(), self.client()
+        self.assertEqual(a.query("begin")[2], "T")
+        pid = a.scalar("select pg_backend_pid()")
+        self.assertEqual(self.status()["db"]["in_use"], 1)
+        self.assertEqual(a.scalar("select pg_backend_pid()"), pid)
+        a.query("commit")
+        self.assertEqual(b.scalar("select pg_backend_pid()"), pid)
+
+    def test_wait_timeout_returns_53300(self):
+        a, b = self.client(), self.client()
+        a.query("begin")
+        started = time.monotonic()
+        _, error, _ = b.query("select 1")
+        self.assertEqual(error["C"], "53300")
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(self.status()["db"]["timeouts"], 1)
+        # The connection is lent again once the transaction ends
+        a.query("commit")
+        self.assertEqual(b.scalar("select 1"), "1")
+
+    def test_large_results_are_truncated_to_max_rows(self):
+        c = self.client()
+        rows, error, _ = c.query("select generate_series(1, 20)")
+        self.assertIsNone(error)
+        self.assertEqual([r[0] for r in rows], ["1", "2", "3", "4", "5"])
+        self.assertIn("truncated to 5 rows", c.notices[-1])
+        self.assertEqual(c.scalar("select 1"), "1")
+        self.assertEqual(self.status()["db"]["truncated_results"], 1)
+
+    def test_statement_timeout_cancels_long_queries(self):
+        c = self.client()
+        started = time.monotonic()
+        _, error, status = c.query("select pg_sleep(10)")
+        self.assertEqual(error["C"], "57014")
+        self.assertEqual(status, "I")
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_session_settings_do_not_leak_to_the_next_client(self):
+        a, b = self.client(), self.client()
+        a.query("set statement_timeout = 0")
+        a.query("set search_path = nowhere")
+        pid = a.scalar("select pg_backend_pid()")
+        self.assertEqual(b.scalar("select pg_backend_pid()"), pid)
+        self.assertEqual(b.scalar("show statement_timeout"), "1s")
+        self.assertEqual(b.scalar("show search_path"), '"$user", public')
+        self.assertGreaterEqual(self.status()["db"]["resets"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
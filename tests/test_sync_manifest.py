@@ -0,0 +1,143 @@
+"""scripts/sync-manifest.py: incremental installs of the .claude tree."""
+
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+from support import load_script, tempdir
+
+sm = load_script("sync-manifest.py")
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+class TreeTestCase(unittest.TestCase):
+    """A small .claude source tree and an empty install dir."""
+
+    def setUp(self):
+        tmp = tempdir(self)
+        self.src = os.path.join(tmp, "src")
+        self.dest = os.path.join(tmp, "dest")
+        os.makedirs(self.dest)
+        write(self.s("agents/planner.md"), "planner v1")
+        write(self.s("commands/gsd/help.md"), "help v1")
+        write(self.s("skills/seo/SKILL.md"), "seo v1")
+        write(self.s("skills/seo/.venv/lib/site.py"), "not installed")
+        write(self.s("rules/python/style.md"), "style v1")
+
+    def s(self, rel):
+        return os.path.join(self.src, rel)
+
+    def d(self, rel):
+        return os.path.join(self.dest, rel)
+
+    def sync(self, components=None):
+        return sm.sync(self.src, self.dest, components or sm.DEFAULT_COMPONENTS)
+
+    def bump(self, rel, content):
+        """Change a source file, making sure its mtime moves too."""
+        write(self.s(rel), content)
+        st = os.stat(self.s(rel))
+        os.utime(self.s(rel), ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+class SyncTest(TreeTestCase):
+    def test_first_run_installs_and_overwrites(self):
+        write(self.d("agents/planner.md"), "old unmanaged copy")
+        stats = self.sync()
+        self.assertEqual(stats["added"], 3)
+        self.assertEqual(stats["updated"], 1)
+        self.assertEqual(read(self.d("agents/planner.md")), "planner v1")
+        self.assertFalse(os.path.exists(self.d("skills/seo/.venv")))
+        self.assertEqual(self.sync()["unchanged"], 4)
+
+    def test_upstream_change_updates_untouched_file(self):
+        self.sync()
+        self.bump("agents/planner.md", "planner v2")
+        stats = self.sync()
+        self.assertEqual((stats["updated"], stats["unchanged"]), (1, 3))
+        self.assertEqual(read(self.d("agents/planner.md")), "planner v2")
+
+    def test_user_edit_is_kept(self):
+        self.sync()
+        write(self.d("agents/planner.md"), "my planner")
+        self.bump("agents/planner.md", "planner v2")
+        self.assertEqual(self.sync()["kept"], 1)
+        self.assertEqual(read(self.d("agents/planner.md")), "my planner")
+        # Still the user's on the next run, and on the next upstream change
+        self.bump("agents/planner.md", "planner v3")
+        self.assertEqual(self.sync()["kept"], 1)
+        self.assertEqual(read(self.d("agents/planner.md")), "my planner")
+
+    def test_removed_upstream_is_deleted_unless_edited(self):
+        self.sync()
+        write(self.d("rules/python/style.md"), "my rules")
+        os.remove(self.s("rules/python/style.md"))
+        os.remove(self.s("commands/gsd/help.md"))
+        stats = self.sync()
+        self.assertEqual((stats["removed"], stats["kept"]), (1, 1))
+        self.assertFalse(os.path.exists(self.d("commands/gsd")))
+        self.assertEqual(read(self.d("rules/python/style.md")), "my rules")
+
+    def test_unchanged_sources_are_not_rehashed(self):
+        self.sync()
+        hashed = []
+        real = sm.file_hash
+
+        def counting(path):
+            hashed.append(path)
+            return real(path)
+
+        with mock.patch.object(sm, "file_hash", counting):
+            self.sync()
+        self.assertEqual(hashed, [])
+        self.bump("skills/seo/SKILL.md", "seo v2")
+        with mock.patch.object(sm, "file_hash", counting):
+            self.sync()
+        self.assertIn(self.s("skills/seo/SKILL.md"), hashed)
+        self.assertEqual(len([p for p in hashed if p.startswith(self.src)]), 1)
+
+
+class MainTest(TreeTestCase):
+    def main(self, *components):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sm.main(["sync", self.src, self.dest, *components])
+
+    def test_deselected_components_are_removed(self):
+        self.main()
+        write(self.d("rules/python/style.md"), "my rules")
+        self.main("agents", "skills/se*")
+        self.assertTrue(os.path.exists(self.d("agents/planner.md")))
+        self.assertTrue(os.path.exists(self.d("skills/seo/SKILL.md")))
+        self.assertFalse(os.path.exists(self.d("commands/gsd/help.md")))
+        self.assertEqual(read(self.d("rules/python/style.md")), "my rules")
+
+    def test_pattern_matching_nothing_is_an_error(self):
+        self.main()
+        with contextlib.redirect_stderr(io.StringIO()) as err, self.assertRaises(SystemExit):
+            self.main("agents", "agnets")
+        self.assertIn("agnets", err.getvalue())
+        self.assertTrue(os.path.exists(self.d("commands/gsd/help.md")))
+
+    def test_empty_selection_is_refused(self):
+        self.main()
+        empty = os.path.join(os.path.dirname(self.src), "empty")
+        os.makedirs(empty)
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            sm.main(["sync", empty, self.dest])
+        self.assertTrue(os.path.exists(self.d("agents/planner.md")))
+
+
+if __name__ == "__main__":
+    unittest.main()